@@ -1,20 +1,45 @@
+import time
+STARTUP_STARTED = time.perf_counter()  # before the heavy imports, so they count towards startup
+
 import os
+import re
+import hashlib
+import threading
 import sys
-import uuid
-import sqlite3
 import tkinter as tk
 import tkinter.simpledialog as simpledialog
 from tkinter import ttk, messagebox, scrolledtext
-from PIL import Image, ImageTk
+from concurrent.futures import Future
 from datetime import datetime, date, timedelta
+from utils.editlog import EditLog, replay_edit_log
+from utils.feedback import FeedbackCache, FeedbackService, backend_from_env
+from utils.metrics import ENABLED as METRICS_ENABLED, metrics, span, timed
+from utils.migrations import print_progress
+from utils.sentiment import MATCHER_VERSION, score_journal_history, score_text
+from utils.startup import StartupTimer, report_enabled
+from utils.storage import LifeStore, PRIORITY_CATEGORIES, MATCH_START, MATCH_END
+from utils.tasks import PagedTaskListView, TaskListView, PAGE_SIZE, PRIORITY_LEVELS, STATUS_FILTERS
+
+OVERVIEW_SPANS = ['Month', 'Quarter']
+ANALYTICS_RANGES = {'Last 7 days': 7, 'Last 30 days': 30, 'Last 90 days': 90, 'Last year': 365}
+PREVIEW_CHARS = 40  # overview rows show the first line of a day, cut to this length
+BACKGROUND_POLL_INTERVAL = 100  # milliseconds between checks on background work
+FEEDBACK_EXIT_WAIT = 5  # seconds unfinished journal feedback gets on exit before it is cut short
+
+# Pre-scaled copies of assets/icon.png, largest first; see assets/create_iconset.py
+ICON_CACHE = [os.path.join("assets", "icon.iconset", name) for name in ("icon_32x32@2x.png", "icon_16x16@2x.png")]
 
 class LifeManagementApp:
     def __init__(self):
+        self.startup = StartupTimer(STARTUP_STARTED)
+        self.startup.mark("imports")
         self.root = tk.Tk()
         self.root.title("Orchestration Agent")
+        self.startup.mark("window")
         
         # Set application icon
         self.set_app_icon()
+        self.startup.mark("icon")
 
         # set the window to full screen
         screen_width = self.root.winfo_screenwidth()
@@ -24,85 +49,128 @@ class LifeManagementApp:
         
         # Initialize autosave variables
         self.autosave_enabled = True
-        self.autosave_delay = 2000  # milliseconds
+        # Every edit is in the edit log first, so saves can wait for a long pause in typing
+        self.autosave_delay = 30000  # milliseconds
         self.autosave_jobs = {}
+        self.saved_hashes = {}  # widget name -> digest of the text last loaded or saved
+        self.saving = {}  # widget name -> (future, digest) of its latest save not yet committed
         
         # Initialize database
         self.init_database()
+        self.startup.mark("database")
+
+        # Journal feedback runs on a worker pool; chunks are polled from the Tk loop
+        self.feedback_service = FeedbackService(backend_from_env(), cache=FeedbackCache(self.store))
+        self.feedback_job = None
+        self.feedback_poll_interval = 50  # milliseconds
         
-        # Create main interface
+        # Create main interface; only the first tab is built and loaded now
         self.create_interface()
-        
-        # Load data
-        self.load_data()
+        self.startup.mark("first tab")
+
+        # Write pending autosaves before the window is destroyed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if METRICS_ENABLED:
+            # F12 shows the slowest recent operations, Ctrl+Shift+M writes the metrics file
+            self.root.bind('<F12>', lambda e: self.toggle_metrics_overlay())
+            self.root.bind('<Control-M>', lambda e: self.dump_metrics())
+            self.metrics_overlay = None
+        # Idle callbacks run after Tk's own redraw, i.e. once the first frame is on screen
+        self.root.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        """Finish the startup report, then start background work held back until now"""
+        self.startup.mark("first paint")
+        if report_enabled():
+            print(self.startup.report())
+
+        # First launch of the day: clear yesterday's daily list and archive old completed tasks, off the UI thread
+        self.when_done(self.store.rollover_tasks_in_background(), self.on_rollover_done)
+        # Index journal entries that predate the search index and roll up older tasks, off the UI thread
+        self.store.start_background_catch_up()
+        # Score any journal entries missing a mood score, also off the UI thread
+        threading.Thread(target=score_journal_history, args=(self.store,),
+                         name='journal-sentiment', daemon=True).start()
+        # Take any due daily/weekly snapshot, then check again every hour
+        from utils.backup import BackupService
+        self.backup_service = BackupService('life_management.db')
+        self.backup_service.start()
+        # With LIFE360_SYNC_URL set, pick up other devices' changes
+        self.start_sync()
+
+    def when_done(self, future, callback):
+        """Call `callback(future)` on the Tk thread once a Future from background work is done, by polling it"""
+        if future.done():
+            callback(future)
+        else:
+            self.root.after(BACKGROUND_POLL_INTERVAL, lambda: self.when_done(future, callback))
+
+    def on_rollover_done(self, future):
+        """Report the day's rollover and show the task lists it changed"""
+        if future.exception() is not None:
+            print(f"Daily rollover failed: {future.exception()}")
+            return
+        rollover = future.result()
+        if rollover:
+            print(f"Daily rollover: {rollover[0]} tasks back to the backlog, {rollover[1]} archived")
+            if self.load_tasks in self.built_tab_loads:
+                self.load_tasks()
+
+    def start_sync(self):
+        """Sync on a worker thread, then reload the built tabs if other devices' changes were applied"""
+        # Imported here rather than at the top, to keep it off the time to first paint
+        from utils.sync import sync_from_env
+
+        # Tk isn't thread-safe: the worker only resolves the Future, and the Tk loop polls it
+        synced = Future()
+
+        def run():
+            try:
+                synced.set_result(sync_from_env(self.store))
+            except Exception as e:
+                synced.set_exception(e)
+        self.sync_thread = threading.Thread(target=run, name='sync', daemon=True)
+        self.sync_thread.start()
+        self.when_done(synced, self.on_sync_done)
+
+    def on_sync_done(self, future):
+        """Reload the built tabs if the sync applied other devices' changes"""
+        if future.exception() is not None:
+            print(f"Sync failed: {future.exception()}")
+            return
+        result = future.result()
+        if result is not None and result[1]:
+            self.reload_built_tabs()
+
+    def reload_built_tabs(self):
+        """Reload every tab built so far, unless an edit is waiting to be autosaved"""
+        if self.autosave_jobs:
+            return  # don't overwrite text being typed; each tab picks the changes up on its next load
+        for load in self.built_tab_loads:
+            load()
     
     def init_database(self):
-        """Initialize SQLite database with required tables"""
-        self.conn = sqlite3.connect('life_management.db')
-        self.cursor = self.conn.cursor()
-        
-        # Life priorities table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS priorities (
-                category TEXT PRIMARY KEY,
-                description TEXT
-            )
-        ''')
-        
-        # Affirmations table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS affirmations (
-                id INTEGER PRIMARY KEY,
-                content TEXT,
-                date_updated TEXT
-            )
-        ''')
-        
-        # Vision board images table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS vision_images (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                image_data TEXT
-            )
-        ''')
-        
-        # Tasks table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                description TEXT,
-                category TEXT,
-                priority INTEGER,
-                status TEXT,
-                is_daily BOOLEAN,
-                created_at TEXT,
-                completed_at TEXT
-            )
-        ''')
-        
-        # Journal entries table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS journal_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_datetime DATETIME,
-                content TEXT,
-                feedback TEXT
-            )
-        ''')
-                            
-        self.conn.commit()
+        """Open the storage layer backing every tab, recovering edits a crash left unsaved"""
+        self.store = LifeStore('life_management.db', migration_progress=print_progress)
+        self.edit_log = EditLog('life_management.db.editlog')
+        recovered = replay_edit_log(self.store, self.edit_log.read())
+        if recovered:
+            self.store.commit_durably().result()
+            print(f"Recovered {recovered} unsaved edits from the edit log")
+        self.edit_log.truncate()
+        self.sync_thread = None
+        self.backup_service = None  # started after the first paint
 
     def set_app_icon(self):
         """Set the application icon (window and Dock)"""
         try:
-            # Set Tkinter window icon (cross-platform)
-            icon_png_path = os.path.join("assets", "icon.png")
-            if os.path.exists(icon_png_path):
-                icon_image = Image.open(icon_png_path)
-                icon_photo = ImageTk.PhotoImage(icon_image)
-                self.root.iconphoto(True, icon_photo)
-                self.icon_image = icon_photo  # Prevent garbage collection
+            # Set Tkinter window icon (cross-platform) from the small pre-scaled
+            # PNGs, which Tk reads natively, instead of decoding the 1024px original
+            if not all(os.path.exists(path) for path in ICON_CACHE):
+                self.build_icon_cache()
+            icon_photos = [tk.PhotoImage(file=path) for path in ICON_CACHE]
+            self.root.iconphoto(True, *icon_photos)
+            self.icon_images = icon_photos  # Prevent garbage collection
 
             # Optionally set icon name
             self.root.iconname("Orchestration Agent")
@@ -110,6 +178,18 @@ class LifeManagementApp:
             print(f"Could not set app icon: {e}")
             pass
     
+    def build_icon_cache(self):
+        """Scale assets/icon.png down into the icon cache (needs Pillow, imported only here)"""
+        from PIL import Image
+
+        source = Image.open(os.path.join("assets", "icon.png")).convert("RGBA")
+        for path in ICON_CACHE:
+            # Sizes come from the file names, e.g. icon_32x32@2x.png is 64px
+            name = os.path.basename(path)
+            size = int(name.split('_')[1].split('x')[0]) * (2 if '@2x' in name else 1)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            source.resize((size, size), Image.Resampling.LANCZOS).save(path)
+
     def schedule_autosave(self, widget_name: str, save_function):
         """Schedule an autosave operation for a specific widget"""
         if not self.autosave_enabled:
@@ -117,17 +197,88 @@ class LifeManagementApp:
             
         # Cancel existing job for this widget
         if widget_name in self.autosave_jobs:
-            self.root.after_cancel(self.autosave_jobs[widget_name])
+            self.root.after_cancel(self.autosave_jobs[widget_name][0])
         
         # Schedule new job using Tkinter's after method
-        job_id = self.root.after(self.autosave_delay, save_function)
-        self.autosave_jobs[widget_name] = job_id
+        job_id = self.root.after(self.autosave_delay, lambda: self.run_autosave(widget_name))
+        self.autosave_jobs[widget_name] = (job_id, save_function)
+
+    def run_autosave(self, widget_name: str):
+        """Run a scheduled autosave and forget its job"""
+        job = self.autosave_jobs.pop(widget_name, None)
+        if job:
+            with span(f'ui.autosave {widget_name}'):
+                job[1]()
+            if not self.autosave_jobs:
+                self.checkpoint_edit_log()
+
+    def checkpoint_edit_log(self):
+        """Empty the edit log once the database has committed every edit logged so far"""
+        seq = self.edit_log.last_seq
+
+        def committed(future):
+            if future.exception() is None:
+                self.edit_log.truncate_if_current(seq)
+        # The writer commits in order, so once this commit is synced to disk every queued save is too
+        self.store.commit_durably().add_done_callback(committed)
+
+    def flush_autosaves(self):
+        """Run every pending autosave now instead of waiting for its timer"""
+        for widget_name in list(self.autosave_jobs):
+            self.root.after_cancel(self.autosave_jobs[widget_name][0])
+            self.run_autosave(widget_name)
     
-    def on_text_change(self, widget_name: str, save_function):
-        """Handle text change events and schedule autosave"""
+    @staticmethod
+    def content_digest(content: str) -> bytes:
+        return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+    def remember_content(self, widget_name: str, content: str):
+        """Record text just loaded into a widget as what the database holds"""
+        self.saving.pop(widget_name, None)  # a save still in flight was for the text before the load
+        self.saved_hashes[widget_name] = self.content_digest(content)
+
+    def save_if_changed(self, widget_name: str, content: str, save):
+        """Queue `save()` if the text differs from what was last loaded or saved.
+
+        The text only counts as saved once the write commits, so a failed save
+        is retried by the next autosave.
+        """
+        digest = self.content_digest(content)
+        if self.saved_hashes.get(widget_name) == digest:
+            return
+        future = save()
+        self.saving[widget_name] = (future, digest)
+
+        def committed(future):
+            if self.saving.get(widget_name) != (future, digest):
+                return  # superseded by a newer save or a load
+            del self.saving[widget_name]
+            if future.exception() is not None:
+                print(f"Could not save {widget_name}: {future.exception()}")
+            else:
+                self.saved_hashes[widget_name] = digest
+        self.when_done(future, committed)
+
+    def on_text_change(self, widget_name: str, save_function, logged_edit=None):
+        """Handle text change events: log the edit, then schedule autosave.
+
+        `logged_edit` returns the (op, *args) edit-log record for the widget's
+        current text, or None when there is nothing to log.
+        """
         def callback(event=None):
+            edit = logged_edit() if logged_edit else None
+            if edit is not None:
+                op, *args = edit
+                if self.edit_log.append_text(op, args[:-1], args[-1]) is None:
+                    return  # a key that didn't change the text (arrows, modifiers)
             self.schedule_autosave(widget_name, save_function)
         return callback
+
+    def weekly_edit(self, op: str, *args):
+        """Edit-log record for the week on screen, or None before a week is loaded"""
+        if not self.loaded_week_start:
+            return None
+        return (op, self.loaded_week_start, *args)
     
     def create_interface(self):
         """Create the main interface with tabs"""
@@ -139,17 +290,42 @@ class LifeManagementApp:
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Create tabs
-        self.create_dashboard_tab()
-        self.create_tasks_tab()
-        self.create_weekly_planning_tab()
-        self.create_journal_tab()
-        # self.create_gene_analysis_tab()  # Add this line
-    
-    def create_dashboard_tab(self):
+        # Tabs start as empty frames; each is built and loaded the first time it is selected
+        self.tab_builders = {}
+        self.built_tab_loads = []
+        for title, create, load in [
+            ("Dashboard", self.create_dashboard_tab, self.load_dashboard),
+            ("Tasks", self.create_tasks_tab, self.load_tasks),
+            ("Weekly Planning", self.create_weekly_planning_tab, self.update_week_dates),
+            ("Journal", self.create_journal_tab, self.load_journal_history_for_date),
+            ("Analytics", self.create_analytics_tab, self.load_analytics),
+            # ("Gene Analysis", self.create_gene_analysis_tab, None),  # Add this line
+        ]:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tab_builders[str(frame)] = (title, create, load)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.build_tab(self.notebook.select())
+
+    def on_tab_changed(self, event=None):
+        self.build_tab(self.notebook.select())
+
+    def build_tab(self, tab_id: str):
+        """Build and load a tab the first time it is shown"""
+        builder = self.tab_builders.pop(str(tab_id), None)
+        if builder is None:
+            return
+        title, create, load = builder
+        started = time.perf_counter()
+        with span(f'ui.build_tab {title}'):
+            create(self.notebook.nametowidget(tab_id))
+            load()
+        self.built_tab_loads.append(load)
+        if report_enabled():
+            print(f"Built {title} tab in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def create_dashboard_tab(self, dashboard_frame):
         """Create the dashboard tab with priorities, affirmations, and vision board"""
-        dashboard_frame = ttk.Frame(self.notebook)
-        self.notebook.add(dashboard_frame, text="Dashboard")
 
         dashboard_content = ttk.Frame(dashboard_frame)
         dashboard_content.pack(fill=tk.BOTH, expand=True)
@@ -167,9 +343,7 @@ class LifeManagementApp:
             priorities_frame.grid_columnconfigure(col, weight=1)
 
         self.priority_vars = {}
-        priorities = ['career', 'health', 'finances', 'religion', 'relationships', 'hobbies']
-        
-        for i, priority in enumerate(priorities):
+        for i, priority in enumerate(PRIORITY_CATEGORIES):
             row = i // 3
             col = i % 3
             
@@ -182,7 +356,10 @@ class LifeManagementApp:
             priorities_frame.grid_rowconfigure(row*2+1, weight=1)
             
             # Bind autosave to text changes
-            text_widget.bind('<KeyRelease>', self.on_text_change(f'priority_{priority}', self.save_priorities))
+            text_widget.bind('<KeyRelease>', self.on_text_change(
+                f'priority_{priority}', self.save_priorities,
+                lambda p=priority, w=text_widget: ('priority', p, w.get(1.0, tk.END).strip())
+            ))
             
             self.priority_vars[priority] = text_widget
         
@@ -198,7 +375,10 @@ class LifeManagementApp:
         self.affirmations_text.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # Bind autosave to text changes
-        self.affirmations_text.bind('<KeyRelease>', self.on_text_change('affirmations', self.save_affirmations))
+        self.affirmations_text.bind('<KeyRelease>', self.on_text_change(
+            'affirmations', self.save_affirmations,
+            lambda: ('affirmations', self.affirmations_text.get(1.0, tk.END).strip())
+        ))
         
         ttk.Button(affirmations_frame, text="Save Affirmations", 
                   command=self.save_affirmations).pack(pady=5)
@@ -214,10 +394,8 @@ class LifeManagementApp:
         # self.vision_display_frame = ttk.Frame(vision_frame)
         # self.vision_display_frame.pack(fill=tk.BOTH, expand=True, pady=10)
     
-    def create_tasks_tab(self):
+    def create_tasks_tab(self, tasks_frame):
         """Create the tasks tab with daily and massive backlogs"""
-        tasks_frame = ttk.Frame(self.notebook)
-        self.notebook.add(tasks_frame, text="Tasks")
 
         # Create two columns for daily and massive backlog
         daily_frame = ttk.LabelFrame(tasks_frame, text="Today's Tasks", padding=10)
@@ -241,7 +419,7 @@ class LifeManagementApp:
         daily_list_frame = ttk.Frame(daily_frame)
         daily_list_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.daily_tasks_listbox = tk.Listbox(daily_list_frame, selectmode=tk.SINGLE)
+        self.daily_tasks_listbox = tk.Listbox(daily_list_frame, selectmode=tk.EXTENDED)
         daily_scrollbar = ttk.Scrollbar(daily_list_frame, orient=tk.VERTICAL)
         self.daily_tasks_listbox.config(yscrollcommand=daily_scrollbar.set)
         daily_scrollbar.config(command=self.daily_tasks_listbox.yview)
@@ -257,6 +435,7 @@ class LifeManagementApp:
                   command=lambda: self.toggle_task(True)).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(daily_buttons_frame, text="Delete", 
                   command=lambda: self.delete_task(True)).pack(side=tk.LEFT)
+        self.create_priority_controls(daily_buttons_frame, True)
 
         # Massive backlog section
         backlog_input_frame = ttk.Frame(backlog_frame)
@@ -269,13 +448,31 @@ class LifeManagementApp:
         ttk.Button(backlog_input_frame, text="Add Task", 
                   command=lambda: self.add_task(False)).pack(side=tk.RIGHT)
 
+        # Backlog status filter (applied in SQL)
+        backlog_filter_frame = ttk.Frame(backlog_frame)
+        backlog_filter_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(backlog_filter_frame, text="Show:").pack(side=tk.LEFT, padx=(0, 5))
+        self.backlog_filter_var = tk.StringVar(value='pending')
+        backlog_filter = ttk.Combobox(backlog_filter_frame, textvariable=self.backlog_filter_var,
+                                      values=STATUS_FILTERS, state='readonly', width=10)
+        backlog_filter.pack(side=tk.LEFT)
+        backlog_filter.bind('<<ComboboxSelected>>',
+                            lambda e: self.backlog_view.reload(self.backlog_filter_var.get()))
+        ttk.Button(backlog_filter_frame, text="Archive",
+                   command=self.open_task_archive).pack(side=tk.RIGHT)
+
         # Backlog tasks listbox with scrollbar
         backlog_list_frame = ttk.Frame(backlog_frame)
         backlog_list_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.backlog_tasks_listbox = tk.Listbox(backlog_list_frame, selectmode=tk.SINGLE)
+        self.backlog_tasks_listbox = tk.Listbox(backlog_list_frame, selectmode=tk.EXTENDED)
         backlog_scrollbar = ttk.Scrollbar(backlog_list_frame, orient=tk.VERTICAL)
-        self.backlog_tasks_listbox.config(yscrollcommand=backlog_scrollbar.set)
+        # The backlog is windowed: only rows scrolled into view are fetched
+        self.backlog_view = PagedTaskListView(
+            self.backlog_tasks_listbox,
+            lambda status, after, limit: self.store.list_tasks_page(False, status, after, limit)
+        )
+        self.backlog_tasks_listbox.config(yscrollcommand=self.backlog_view.scroll_command(backlog_scrollbar.set))
         backlog_scrollbar.config(command=self.backlog_tasks_listbox.yview)
 
         self.backlog_tasks_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -291,15 +488,74 @@ class LifeManagementApp:
                   command=lambda: self.toggle_task(False)).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(backlog_buttons_frame, text="Delete", 
                   command=lambda: self.delete_task(False)).pack(side=tk.LEFT)
+        self.create_priority_controls(backlog_buttons_frame, False)
+
+        # Row-level views over both listboxes
+        self.daily_view = TaskListView(self.daily_tasks_listbox)
 
         # Bind double-click to edit_task for both listboxes
         self.daily_tasks_listbox.bind('<Double-Button-1>', self.edit_task)
         self.backlog_tasks_listbox.bind('<Double-Button-1>', self.edit_task)
 
-    def create_journal_tab(self):
+    def create_priority_controls(self, parent, is_daily: bool):
+        """Priority picker and button that re-prioritize the selected tasks"""
+        priority_var = tk.StringVar(value=PRIORITY_LEVELS[1])
+        ttk.Button(parent, text="Set Priority",
+                   command=lambda: self.set_task_priority(is_daily, priority_var.get())).pack(side=tk.RIGHT)
+        ttk.Combobox(parent, textvariable=priority_var, values=list(PRIORITY_LEVELS.values()),
+                     state='readonly', width=8).pack(side=tk.RIGHT, padx=(0, 5))
+
+    def open_task_archive(self):
+        """Open a window browsing archived tasks; the archive is only queried from here"""
+        window = tk.Toplevel(self.root)
+        window.title("Task Archive")
+        window.geometry("600x500")
+
+        list_frame = ttk.Frame(window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.archive_listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED)
+        archive_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.archive_listbox.yview)
+        self.archive_listbox.config(yscrollcommand=archive_scrollbar.set)
+        self.archive_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        archive_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        buttons_frame = ttk.Frame(window)
+        buttons_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.archive_more_button = ttk.Button(buttons_frame, text="Load More", command=self.load_archive_page)
+        self.archive_more_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons_frame, text="Restore to Backlog", command=self.restore_archived_tasks).pack(side=tk.LEFT)
+
+        self.archive_tasks = []
+        self.load_archive_page()
+
+    @timed('ui.load_archive_page')
+    def load_archive_page(self):
+        """Append the next page of archived tasks, most recently completed first"""
+        before = None
+        if self.archive_tasks:
+            last = self.archive_tasks[-1]
+            before = (last.completed_at, last.id)
+        page = self.store.list_archived_tasks(before, PAGE_SIZE)
+        self.archive_tasks.extend(page)
+        self.archive_listbox.insert(tk.END, *[f"{(task.completed_at or '')[:10]}  {task.description}" for task in page])
+        if len(page) < PAGE_SIZE:
+            self.archive_more_button.config(state=tk.DISABLED)
+
+    def restore_archived_tasks(self):
+        """Move the selected archived tasks back to the backlog as pending"""
+        positions = self.archive_listbox.curselection()
+        if not positions:
+            messagebox.showwarning("Warning", "Please select a task first.")
+            return
+        tasks = [self.archive_tasks[position] for position in positions]
+        self.store.restore_archived_tasks([task.id for task in tasks]).result()
+        for position in reversed(positions):
+            self.archive_listbox.delete(position)
+            del self.archive_tasks[position]
+        self.backlog_view.insert_many(task._replace(status='pending', completed_at=None) for task in tasks)
+
+    def create_journal_tab(self, journal_frame):
         """Create the journal tab with reflection input and history"""
-        journal_frame = ttk.Frame(self.notebook)
-        self.notebook.add(journal_frame, text="Journal")
 
         # Use grid for full control
         journal_frame.columnconfigure(0, weight=3)
@@ -350,6 +606,22 @@ class LifeManagementApp:
         right_frame = ttk.LabelFrame(journal_frame, text="Journal History", padding=10)
         right_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 10), pady=10)
 
+        # Full-text search over entries and feedback
+        search_frame = ttk.Frame(right_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=(0, 5))
+        self.journal_search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.journal_search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        search_entry.bind('<Return>', lambda e: self.search_journal())
+        ttk.Button(search_frame, text="Search", command=self.search_journal).pack(side=tk.LEFT)
+
+        self.search_results_text = scrolledtext.ScrolledText(right_frame, wrap=tk.WORD, state=tk.DISABLED,
+                                                             height=8, cursor="hand2")
+        self.search_results_text.pack(fill=tk.X, pady=(0, 10))
+        self.search_results_text.tag_configure("match", background="#fde68a")
+        self.search_results_text.tag_configure("date", font=("TkDefaultFont", 10, "bold"))
+
         # Date selector for history
         history_date_frame = ttk.Frame(right_frame)
         history_date_frame.pack(fill=tk.X, pady=(0, 5))
@@ -369,10 +641,8 @@ class LifeManagementApp:
         self.history_text = scrolledtext.ScrolledText(history_list_frame, wrap=tk.WORD, state=tk.DISABLED, height=20)
         self.history_text.pack(fill=tk.BOTH, expand=True)
 
-    def create_weekly_planning_tab(self):
+    def create_weekly_planning_tab(self, weekly_frame):
         """Create the weekly planning tab with 7 columns for each day of the week"""
-        weekly_frame = ttk.Frame(self.notebook)
-        self.notebook.add(weekly_frame, text="Weekly Planning")
 
         # Top frame for week start selection
         top_frame = ttk.Frame(weekly_frame)
@@ -390,6 +660,7 @@ class LifeManagementApp:
 
         ttk.Button(top_frame, text="⟶", command=self.goto_next_week, width=0.25).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(top_frame, text="Set Week", command=self.update_week_dates).pack(side=tk.LEFT)
+        ttk.Button(top_frame, text="Overview", command=self.open_planning_overview).pack(side=tk.LEFT, padx=(10, 0))
 
         # Weekly Intentions (top, right of week selector)
         intentions_frame = ttk.Frame(top_frame)
@@ -397,7 +668,10 @@ class LifeManagementApp:
         ttk.Label(intentions_frame, text="Weekly Intentions:").pack(side=tk.LEFT, padx=(0, 5))
         self.weekly_intentions_text = tk.Text(intentions_frame, height=6, width=40, wrap=tk.WORD, undo=True)
         self.weekly_intentions_text.pack(side=tk.RIGHT, fill=tk.X, expand=True)
-        self.weekly_intentions_text.bind('<KeyRelease>', self.on_text_change('weekly_intentions', self.save_weekly_planning))
+        self.weekly_intentions_text.bind('<KeyRelease>', self.on_text_change(
+            'weekly_intentions', self.save_weekly_planning,
+            lambda: self.weekly_edit('weekly_intentions', self.weekly_intentions_text.get(1.0, tk.END).strip())
+        ))
 
         # Frame for the 7 columns (full width below)
         days_frame = ttk.Frame(weekly_frame)
@@ -409,6 +683,7 @@ class LifeManagementApp:
             days_frame.grid_columnconfigure(col, weight=1)
 
         self.weekday_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        self.loaded_week_start = None
         self.weekday_date_vars = []
         self.weekday_text_widgets = []
 
@@ -422,25 +697,17 @@ class LifeManagementApp:
             text_widget = tk.Text(days_frame, height=15, wrap=tk.WORD, undo=True, insertbackground="grey")
             text_widget.grid(row=2, column=col, padx=0, pady=0, sticky="nsew")
             # Bind autosave to text changes
-            text_widget.bind('<KeyRelease>', self.on_text_change(f'weekly_{col}', self.save_weekly_planning))
+            text_widget.bind('<KeyRelease>', self.on_text_change(
+                f'weekly_{col}', self.save_weekly_planning,
+                lambda c=col, w=text_widget: self.weekly_edit('weekly_day', c, w.get(1.0, tk.END).strip())
+            ))
             self.weekday_text_widgets.append(text_widget)
 
-        # Create table for weekly planning if not exists
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS weekly_planning (
-                week_start TEXT,
-                day_index INTEGER,
-                content TEXT,
-                PRIMARY KEY (week_start, day_index)
-            )
-        ''')
-        self.conn.commit()
-
-        # Initialize the week dates and load data
-        self.update_week_dates()
-
+    @timed('ui.update_week_dates')
     def update_week_dates(self):
         """Update the date entries for each day of the week based on the start date and load saved data"""
+        # Edits still waiting on their timer belong to the week currently shown
+        self.flush_autosaves()
         try:
             input_date = datetime.strptime(self.week_start_var.get(), "%Y-%m-%d").date()
             # Find the previous Monday (or the same day if it's Monday)
@@ -456,37 +723,39 @@ class LifeManagementApp:
                 text_widget.config(background="#f5f5f5", foreground="#555555")
         self.load_weekly_planning()
 
+    @timed('ui.save_weekly_planning')
     def save_weekly_planning(self):
-        """Save the weekly planning text for each day and intentions into the database"""
-        week_start = self.week_start_var.get()
-        intentions = self.weekly_intentions_text.get(1.0, tk.END).strip()
+        """Save the days and intentions that changed since the week was loaded or last saved"""
+        week_start = self.loaded_week_start
+        if not week_start:
+            return
         for i, text_widget in enumerate(self.weekday_text_widgets):
             content = text_widget.get(1.0, tk.END).strip()
-            self.cursor.execute(
-                "INSERT OR REPLACE INTO weekly_planning (week_start, day_index, content, weekly_intentions) VALUES (?, ?, ?, ?)",
-                (week_start, i, content, intentions)
-            )
-        self.conn.commit()
+            self.save_if_changed(f'weekly_{i}', content, lambda: self.store.save_weekly_day(week_start, i, content))
+        intentions = self.weekly_intentions_text.get(1.0, tk.END).strip()
+        self.save_if_changed('weekly_intentions', intentions,
+                             lambda: self.store.save_weekly_intentions(week_start, intentions))
 
+    @timed('ui.load_weekly_planning')
     def load_weekly_planning(self):
         """Load the weekly planning text for each day and intentions from the database"""
         week_start = self.week_start_var.get()
-        self.cursor.execute(
-            "SELECT day_index, content, weekly_intentions FROM weekly_planning WHERE week_start = ?",
-            (week_start,)
-        )
-        data = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
-        intentions = None
+        contents, intentions = self.store.load_weekly_planning(week_start)
         for i, text_widget in enumerate(self.weekday_text_widgets):
             text_widget.delete(1.0, tk.END)
-            if i in data:
-                text_widget.insert(1.0, data[i][0])
-                if data[i][1]:
-                    intentions = data[i][1]
-        # Set intentions (if any row has it, set it)
+            content = contents.get(i) or ""
+            text_widget.insert(1.0, content)
+            self.remember_content(f'weekly_{i}', content)
         self.weekly_intentions_text.delete(1.0, tk.END)
-        if intentions:
-            self.weekly_intentions_text.insert(1.0, intentions)
+        self.weekly_intentions_text.insert(1.0, intentions or "")
+        self.remember_content('weekly_intentions', intentions or "")
+        # Saves go to the week on screen, even if the entry has been edited since
+        self.loaded_week_start = week_start
+        # Warm the cache for the weeks either side, so stepping to them skips the database
+        monday = datetime.strptime(week_start, "%Y-%m-%d").date()
+        self.store.prefetch_weekly_planning(
+            [(monday + timedelta(days=offset)).isoformat() for offset in (7, -7)]
+        )
 
     def goto_previous_week(self):
         """Go to the previous week (Monday) and update the view"""
@@ -508,50 +777,219 @@ class LifeManagementApp:
         except Exception as e:
             messagebox.showerror("Error", f"Could not go to next week: {e}")
 
-    def load_data(self):
-        """Load all data from database"""
+    def create_analytics_tab(self, analytics_frame):
+        """Create the analytics tab; every figure comes from the daily task rollups"""
+        controls = ttk.Frame(analytics_frame)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Label(controls, text="Period:").pack(side=tk.LEFT, padx=(0, 5))
+        self.analytics_range_var = tk.StringVar(value='Last 30 days')
+        period = ttk.Combobox(controls, textvariable=self.analytics_range_var, values=list(ANALYTICS_RANGES),
+                              state='readonly', width=14)
+        period.pack(side=tk.LEFT)
+        period.bind('<<ComboboxSelected>>', lambda e: self.load_analytics())
+        ttk.Button(controls, text="Refresh", command=self.load_analytics).pack(side=tk.LEFT, padx=(10, 0))
+
+        summary_frame = ttk.LabelFrame(analytics_frame, text="Summary", padding=10)
+        summary_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.analytics_summary_var = tk.StringVar()
+        ttk.Label(summary_frame, textvariable=self.analytics_summary_var, justify=tk.LEFT).pack(anchor="w")
+
+        category_frame = ttk.LabelFrame(analytics_frame, text="By Category", padding=10)
+        category_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        columns = ("category", "created", "completed", "rate", "lead")
+        self.analytics_tree = ttk.Treeview(category_frame, columns=columns, show="headings")
+        for column, heading in zip(columns, ("Category", "Created", "Completed", "Completion Rate", "Avg Lead Time")):
+            self.analytics_tree.heading(column, text=heading)
+        self.analytics_tree.pack(fill=tk.BOTH, expand=True)
+
+    @timed('ui.load_analytics')
+    def load_analytics(self):
+        """Show completion stats for the chosen period"""
+        if not self.store.task_rollups_built():
+            self.analytics_summary_var.set("Crunching task history…")
+            self.root.after(500, self.load_analytics)
+            return
+        today = date.today()
+        start = (today - timedelta(days=ANALYTICS_RANGES[self.analytics_range_var.get()] - 1)).isoformat()
+        days = self.store.get_task_rollups_by_day(start, today.isoformat())
+        created = sum(row[1] for row in days)
+        completed = sum(row[2] for row in days)
+        lead_seconds = sum(row[3] for row in days)
+        self.analytics_summary_var.set(
+            f"Created: {created}    Completed: {completed}    "
+            f"Completion rate: {self.format_rate(completed, created)}    "
+            f"Avg lead time: {self.format_lead_time(lead_seconds, completed)}\n"
+            f"Active days: {sum(1 for row in days if row[2])}    "
+            f"Current streak: {self.completion_streak(today)} days"
+        )
+        tree = self.analytics_tree
+        tree.delete(*tree.get_children())
+        for category, created, completed, lead_seconds in self.store.get_task_rollups_by_category(start, today.isoformat()):
+            tree.insert("", tk.END, values=(category.capitalize(), created, completed,
+                                            self.format_rate(completed, created),
+                                            self.format_lead_time(lead_seconds, completed)))
+
+    def completion_streak(self, today: date) -> int:
+        """Consecutive days, ending today or yesterday, with at least one completed task"""
+        streak = 0
+        expected = today
+        for day in self.store.get_completion_days(today.isoformat()):
+            if streak == 0 and day == (today - timedelta(days=1)).isoformat():
+                expected = today - timedelta(days=1)  # today may just not have a completion yet
+            if day != expected.isoformat():
+                break
+            streak += 1
+            expected -= timedelta(days=1)
+        return streak
+
+    def format_rate(self, completed: int, created: int) -> str:
+        return f"{completed / created:.0%}" if created else "—"
+
+    def format_lead_time(self, lead_seconds: float, completed: int) -> str:
+        if not completed:
+            return "—"
+        hours = lead_seconds / completed / 3600
+        return f"{hours / 24:.1f} days" if hours >= 24 else f"{hours:.1f} hours"
+
+    def open_planning_overview(self):
+        """Open a window previewing every week of the month or quarter around the current week"""
+        # Unsaved edits to the week on screen should show up in the overview
+        self.flush_autosaves()
+        window = tk.Toplevel(self.root)
+        window.title("Planning Overview")
+        window.geometry("900x600")
+
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Label(controls, text="Show:").pack(side=tk.LEFT, padx=(0, 5))
+        self.overview_span_var = tk.StringVar(value='Month')
+        span = ttk.Combobox(controls, textvariable=self.overview_span_var, values=OVERVIEW_SPANS,
+                            state='readonly', width=10)
+        span.pack(side=tk.LEFT)
+        span.bind('<<ComboboxSelected>>', lambda e: self.load_planning_overview())
+        ttk.Label(controls, text="Double-click a week to open it").pack(side=tk.RIGHT)
+
+        # Weeks are top-level rows; their days are only inserted when a week is expanded
+        self.overview_tree = ttk.Treeview(window, columns=("preview",), height=16)
+        self.overview_tree.heading("#0", text="Week")
+        self.overview_tree.heading("preview", text="Preview")
+        self.overview_tree.column("#0", width=160, stretch=False)
+        self.overview_tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.overview_tree.bind('<<TreeviewOpen>>', self.expand_overview_week)
+        self.overview_tree.bind('<<TreeviewSelect>>', self.show_overview_text)
+        self.overview_tree.bind('<Double-Button-1>', self.open_overview_week)
+
+        # Full text of the selected row
+        self.overview_text = scrolledtext.ScrolledText(window, height=8, wrap=tk.WORD, state=tk.DISABLED)
+        self.overview_text.pack(fill=tk.X, padx=10, pady=10)
+        self.load_planning_overview()
+
+    def overview_weeks(self):
+        """Mondays of the weeks in the month or quarter that contains the current week"""
+        current = datetime.strptime(self.loaded_week_start or self.week_start_var.get(), "%Y-%m-%d").date()
+        months = 3 if self.overview_span_var.get() == 'Quarter' else 1
+        first_day = date(current.year, (current.month - 1) // months * months + 1, 1)
+        last_day = first_day
+        for _ in range(months):
+            last_day = (last_day + timedelta(days=32)).replace(day=1)
+        monday = first_day - timedelta(days=first_day.weekday())
+        week_count = (last_day - timedelta(days=1) - monday).days // 7 + 1
+        return [monday + timedelta(weeks=i) for i in range(week_count)]
+
+    @timed('ui.load_planning_overview')
+    def load_planning_overview(self):
+        """Fill the overview with one row per week, read with a single range query"""
+        weeks = self.overview_weeks()
+        self.overview_weeks_data = self.store.load_weekly_planning_range(weeks[0].isoformat(), weeks[-1].isoformat())
+        tree = self.overview_tree
+        tree.delete(*tree.get_children())
+        for monday in weeks:
+            week_start = monday.isoformat()
+            contents, intentions = self.overview_weeks_data.get(week_start, ({}, None))
+            filled = sum(1 for content in contents.values() if content)
+            summary = f"{filled}/7 days planned" + (f" — {self.overview_preview(intentions)}" if intentions else "")
+            tree.insert("", tk.END, iid=week_start, text=week_start, values=(summary,))
+            if filled:
+                tree.insert(week_start, tk.END, iid=f"{week_start}/placeholder", text="…")
+
+    def overview_preview(self, text: str) -> str:
+        first_line = (text or "").strip().split("\n", 1)[0]
+        return first_line if len(first_line) <= PREVIEW_CHARS else first_line[:PREVIEW_CHARS - 1] + "…"
+
+    def expand_overview_week(self, event=None):
+        """Insert a week's day rows the first time it is expanded"""
+        tree = self.overview_tree
+        week_start = tree.focus()
+        if not tree.exists(f"{week_start}/placeholder"):
+            return
+        tree.delete(f"{week_start}/placeholder")
+        contents, _ = self.overview_weeks_data.get(week_start, ({}, None))
+        for day_index, day_name in enumerate(self.weekday_names):
+            content = contents.get(day_index)
+            if content:
+                tree.insert(week_start, tk.END, iid=f"{week_start}/{day_index}", text=day_name,
+                            values=(self.overview_preview(content),))
+
+    def show_overview_text(self, event=None):
+        """Show the full text behind the selected week or day"""
+        selection = self.overview_tree.selection()
+        if not selection:
+            return
+        week_start, _, day = selection[0].partition("/")
+        contents, intentions = self.overview_weeks_data.get(week_start, ({}, None))
+        text = contents.get(int(day), "") if day.isdigit() else intentions or ""
+        self.overview_text.config(state=tk.NORMAL)
+        self.overview_text.delete(1.0, tk.END)
+        self.overview_text.insert(1.0, text or "")
+        self.overview_text.config(state=tk.DISABLED)
+
+    def open_overview_week(self, event=None):
+        """Show the double-clicked week in the weekly editor"""
+        item = self.overview_tree.focus()
+        if not item:
+            return
+        self.week_start_var.set(item.partition("/")[0])
+        self.update_week_dates()
+
+    def load_dashboard(self):
+        """Load the dashboard's priorities and affirmations"""
         self.load_priorities()
         self.load_affirmations()
-        self.load_tasks()
-        self.load_journal_history_for_date()
     
+    @timed('ui.load_priorities')
     def load_priorities(self):
         """Load life priorities from database"""
-        self.cursor.execute("SELECT category, description FROM priorities")
-        priorities = self.cursor.fetchall()
+        priorities = self.store.get_priorities()
         
-        for category, description in priorities:
-            if category in self.priority_vars:
-                self.priority_vars[category].delete(1.0, tk.END)
-                self.priority_vars[category].insert(1.0, description or "")
+        for category, text_widget in self.priority_vars.items():
+            description = priorities.get(category, "")
+            text_widget.delete(1.0, tk.END)
+            text_widget.insert(1.0, description)
+            self.remember_content(f'priority_{category}', description)
     
+    @timed('ui.save_priorities')
     def save_priorities(self):
-        """Save life priorities to database"""
+        """Save the life priorities that changed to database"""
         for category, text_widget in self.priority_vars.items():
             description = text_widget.get(1.0, tk.END).strip()
-            self.cursor.execute(
-                "INSERT OR REPLACE INTO priorities (category, description) VALUES (?, ?)",
-                (category, description)
-            )
-        self.conn.commit()
+            self.save_if_changed(f'priority_{category}', description,
+                                 lambda: self.store.save_priority(category, description))
     
+    @timed('ui.load_affirmations')
     def load_affirmations(self):
         """Load affirmations from database"""
-        self.cursor.execute("SELECT content FROM affirmations ORDER BY date_updated DESC LIMIT 1")
-        result = self.cursor.fetchone()
-        if result:
-            self.affirmations_text.delete(1.0, tk.END)
-            self.affirmations_text.insert(1.0, result[0])
+        content = self.store.get_affirmations() or ""
+        self.affirmations_text.delete(1.0, tk.END)
+        self.affirmations_text.insert(1.0, content)
+        self.remember_content('affirmations', content)
     
+    @timed('ui.save_affirmations')
     def save_affirmations(self):
-        """Save affirmations to database"""
+        """Save affirmations to database if they changed"""
         content = self.affirmations_text.get(1.0, tk.END).strip()
-        self.cursor.execute(
-            "INSERT OR REPLACE INTO affirmations (id, content, date_updated) VALUES (1, ?, ?)",
-            (content, datetime.now().isoformat())
-        )
-        self.conn.commit()
+        self.save_if_changed('affirmations', content, lambda: self.store.save_affirmations(content))
     
+    @timed('ui.add_task')
     def add_task(self, is_daily: bool):
         """Add a new task"""
         entry_widget = self.daily_task_entry if is_daily else self.backlog_task_entry
@@ -560,111 +998,76 @@ class LifeManagementApp:
         if not description:
             return
         
-        task_id = str(uuid.uuid4())
-        self.cursor.execute(
-            """INSERT INTO tasks 
-               (id, description, category, priority, status, is_daily, created_at, completed_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (task_id, description, 'general', 1, 'pending', is_daily, 
-             datetime.now().isoformat(), None)
-        )
-        self.conn.commit()
+        task = self.store.add_task(description, is_daily).result()
         
         entry_widget.delete(0, tk.END)
-        self.load_tasks()
+        self.task_view(is_daily).insert(task)
     
+    def task_view(self, is_daily: bool):
+        """Return the TaskListView for today's tasks or the backlog"""
+        return self.daily_view if is_daily else self.backlog_view
+
+    def selected_tasks(self, is_daily: bool):
+        """Return the selected tasks in a list, warning the user if there are none"""
+        tasks = self.task_view(is_daily).selected_tasks()
+        if not tasks:
+            messagebox.showwarning("Warning", "Please select a task first.")
+        return tasks
+
+    @timed('ui.load_tasks')
     def load_tasks(self):
         """Load tasks from database"""
-        # Load daily tasks
-        self.daily_tasks_listbox.delete(0, tk.END)
-        self.cursor.execute(
-            "SELECT id, description, status FROM tasks WHERE is_daily = ? ORDER BY created_at",
-            (True,)
-        )
-        self.daily_tasks = self.cursor.fetchall()
-
-        for task_id, description, status in self.daily_tasks:
-            display_text = f"{'✓' if status == 'completed' else '○'} {description}"
-            self.daily_tasks_listbox.insert(tk.END, display_text)
-
-        # Load backlog tasks (no filtering)
-        self.backlog_tasks_listbox.delete(0, tk.END)
-        self.cursor.execute(
-            "SELECT id, description, status FROM tasks WHERE is_daily = ? ORDER BY created_at",
-            (False,)
-        )
-        self.backlog_tasks = self.cursor.fetchall()
-
-        for task_id, description, status in self.backlog_tasks:
-            display_text = f"{'✓' if status == 'completed' else '○'} {description}"
-            self.backlog_tasks_listbox.insert(tk.END, display_text)
+        self.daily_view.load(self.store.list_tasks(True))
+        self.backlog_view.reload()
 
+    @timed('ui.toggle_task')
     def toggle_task(self, is_daily: bool):
-        """Toggle task completion status"""
-        listbox = self.daily_tasks_listbox if is_daily else self.backlog_tasks_listbox
-        tasks = self.daily_tasks if is_daily else self.backlog_tasks
-        
-        selection = listbox.curselection()
-        if not selection:
-            messagebox.showwarning("Warning", "Please select a task first.")
+        """Toggle completion of the selected tasks: complete them all, or reopen them if all are done"""
+        tasks = self.selected_tasks(is_daily)
+        if not tasks:
             return
         
-        task_index = selection[0]
-        if task_index >= len(tasks):
-            return
-        
-        task_id, description, current_status = tasks[task_index]
-        new_status = 'completed' if current_status == 'pending' else 'pending'
-        completed_at = datetime.now().isoformat() if new_status == 'completed' else None
-        
-        self.cursor.execute(
-            "UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?",
-            (new_status, completed_at, task_id)
-        )
-        self.conn.commit()
-        self.load_tasks()
+        new_status = 'completed' if any(task.status == 'pending' for task in tasks) else 'pending'
+        updated = self.store.set_tasks_status(tasks, new_status).result()
+        self.task_view(is_daily).update_many(updated)
     
+    @timed('ui.delete_task')
     def delete_task(self, is_daily: bool):
-        """Delete a task"""
-        listbox = self.daily_tasks_listbox if is_daily else self.backlog_tasks_listbox
-        tasks = self.daily_tasks if is_daily else self.backlog_tasks
-        
-        selection = listbox.curselection()
-        if not selection:
-            messagebox.showwarning("Warning", "Please select a task first.")
+        """Delete the selected tasks"""
+        tasks = self.selected_tasks(is_daily)
+        if not tasks:
             return
-        
-        task_index = selection[0]
-        if task_index >= len(tasks):
+        if len(tasks) > 1 and not messagebox.askyesno("Delete Tasks", f"Delete {len(tasks)} tasks?"):
             return
-        
-        task_id = tasks[task_index][0]
     
-        self.cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-        self.conn.commit()
-        self.load_tasks()
+        task_ids = [task.id for task in tasks]
+        self.store.delete_tasks(task_ids).result()
+        self.task_view(is_daily).remove_many(task_ids)
     
+    @timed('ui.move_to_daily')
     def move_to_daily(self):
-        """Move a task from backlog to daily"""
-        selection = self.backlog_tasks_listbox.curselection()
-        if not selection:
-            messagebox.showwarning("Warning", "Please select a task first.")
+        """Move the selected tasks from backlog to daily"""
+        tasks = self.selected_tasks(False)
+        if not tasks:
             return
         
-        task_index = selection[0]
-        tasks = self.backlog_tasks
-        if task_index >= len(tasks):
+        task_ids = [task.id for task in tasks]
+        self.store.move_tasks_to_daily(task_ids).result()
+        self.backlog_view.remove_many(task_ids)
+        self.daily_view.insert_many(tasks)
+
+    @timed('ui.set_task_priority')
+    def set_task_priority(self, is_daily: bool, level: str):
+        """Give the selected tasks the chosen priority"""
+        tasks = self.selected_tasks(is_daily)
+        if not tasks:
             return
         
-        task_id = tasks[task_index][0]
-        
-        self.cursor.execute(
-            "UPDATE tasks SET is_daily = ? WHERE id = ?",
-            (True, task_id)
-        )
-        self.conn.commit()
-        self.load_tasks()
+        priority = next(value for value, name in PRIORITY_LEVELS.items() if name == level)
+        updated = self.store.set_tasks_priority(tasks, priority).result()
+        self.task_view(is_daily).update_many(updated)
     
+    @timed('ui.submit_journal')
     def submit_journal(self):
         """Submit journal reflection and get AI feedback"""
         journal_date = self.journal_date.get()
@@ -689,77 +1092,64 @@ class LifeManagementApp:
             messagebox.showwarning("Warning", "Please write a reflection first.")
             return
 
-        # Generate feedback
-        feedback = self.generate_feedback(content)
-        
-        # Save to database
-        self.cursor.execute(
-            "INSERT OR REPLACE INTO journal_entries (entry_datetime, content, feedback) VALUES (?, ?, ?)",
-            (entry_datetime, content, feedback)
-        )
-        self.conn.commit()
+        # Save right away; feedback is filled in when the backend finishes
+        entry_id = self.store.add_journal_entry(entry_datetime, content, None).result()
+        self.store.save_journal_sentiments([(entry_id, *score_text(content), MATCHER_VERSION)])
         
         # Clear time and journal reflection after submit
         self.journal_time.set("")
         self.journal_text.delete(1.0, tk.END)
         
-        # Display feedback
-        self.feedback_text.config(state=tk.NORMAL)
-        self.feedback_text.delete(1.0, tk.END)
-        self.feedback_text.insert(1.0, feedback)
-        self.feedback_text.config(state=tk.DISABLED)
+        # Stream feedback into the pane without blocking the window
+        self.set_feedback_text("")
+        self.cancel_feedback()
+        self.feedback_job = self.feedback_service.request(
+            content, self.store.get_goal_priorities(),
+            on_complete=lambda feedback: self.store.set_journal_feedback(entry_id, feedback))
+        self.poll_feedback(self.feedback_job)
         
         # Refresh history
         self.load_journal_history_for_date()
     
-    def generate_feedback(self, reflection: str) -> str:
-        """Generate AI feedback for journal reflection"""
-        # Get user's priorities for context
-        self.cursor.execute("SELECT category, description FROM priorities WHERE description IS NOT NULL AND description != ''")
-        priorities = self.cursor.fetchall()
-        
-        goal_context = ", ".join([f"{cat}: {desc}" for cat, desc in priorities])
-        
-        # This is a simplified feedback generator
-        # In production, you would call Ollama API here
-        positive_keywords = ['grateful', 'accomplished', 'progress', 'success', 'happy', 'achieved', 'proud']
-        challenge_keywords = ['difficult', 'struggle', 'failed', 'worried', 'stressed', 'behind', 'overwhelmed']
-        
-        reflection_lower = reflection.lower()
-        has_positive = any(word in reflection_lower for word in positive_keywords)
-        has_challenges = any(word in reflection_lower for word in challenge_keywords)
-        
-        feedback = "**Reflection Analysis:**\n\n"
-        
-        if has_positive:
-            feedback += "✅ Great to see positive momentum! Your reflection shows growth and accomplishment.\n\n"
-        
-        if has_challenges:
-            feedback += "🎯 I notice some challenges mentioned. Remember that obstacles are opportunities for growth.\n\n"
-        
-        feedback += "**Alignment Check:**\n"
-        if goal_context:
-            feedback += f"Your current goals ({goal_context}) provide a strong foundation. Consider how today's experiences connect to these priorities.\n\n"
-        else:
-            feedback += "Consider setting clear life priorities to better align your daily actions with your long-term goals.\n\n"
-        
-        feedback += "**Actionable Suggestions:**\n"
-        feedback += "• Identify one small win from today to build momentum\n"
-        feedback += "• Choose one area from your priorities to focus on tomorrow\n"
-        feedback += "• Practice gratitude for progress made, however small\n"
-        feedback += "• Reflect on lessons learned from today's challenges"
-        
-        return feedback
+    def set_feedback_text(self, text: str):
+        """Replace the contents of the read-only feedback pane"""
+        self.feedback_text.config(state=tk.NORMAL)
+        self.feedback_text.delete(1.0, tk.END)
+        self.feedback_text.insert(1.0, text)
+        self.feedback_text.config(state=tk.DISABLED)
+
+    def cancel_feedback(self):
+        """Stop streaming the run in progress into the pane; it still finishes and saves in the background"""
+        self.feedback_job = None
+
+    def poll_feedback(self, job):
+        """Append streamed feedback chunks to the pane until the job finishes"""
+        if job is not self.feedback_job:
+            return  # the pane moved on to another entry or a newer submit
+        finished = job.finished
+        chunks = job.drain()
+        if chunks:
+            self.feedback_text.config(state=tk.NORMAL)
+            self.feedback_text.insert(tk.END, ''.join(chunks))
+            self.feedback_text.see(tk.END)
+            self.feedback_text.config(state=tk.DISABLED)
+        if not finished:
+            self.root.after(self.feedback_poll_interval, lambda: self.poll_feedback(job))
+            return
+        self.feedback_job = None
+        error = job.error()
+        if error is not None:
+            self.feedback_text.config(state=tk.NORMAL)
+            self.feedback_text.insert(tk.END, f"\n\nFeedback unavailable: {error}")
+            self.feedback_text.config(state=tk.DISABLED)
     
+    @timed('ui.load_journal_entry')
     def load_journal_entry(self, event=None):
         """Load journal entry for selected date"""
+        self.cancel_feedback()
         journal_date = self.journal_date.get()
         
-        self.cursor.execute(
-            "SELECT content, feedback FROM journal_entries WHERE date(entry_datetime) = ?",
-            (journal_date,)
-        )
-        result = self.cursor.fetchone()
+        result = self.store.get_journal_entry(journal_date)
         
         if result:
             content, feedback = result
@@ -776,16 +1166,13 @@ class LifeManagementApp:
             self.feedback_text.delete(1.0, tk.END)
             self.feedback_text.config(state=tk.DISABLED)
 
+    @timed('ui.load_journal_history_for_date')
     def load_journal_history_for_date(self):
         """Always show journal history for the date in the history date entry, in reverse chronological order"""
         date_str = self.history_date_var.get().strip() or date.today().isoformat()
         self.history_text.config(state=tk.NORMAL)
         self.history_text.delete(1.0, tk.END)
-        self.cursor.execute(
-            "SELECT entry_datetime, content FROM journal_entries WHERE date(entry_datetime) = ? ORDER BY entry_datetime DESC",
-            (date_str,)
-        )
-        entries = self.cursor.fetchall()
+        entries = self.store.get_journal_entries_for_date(date_str)
 
         history_buffer = []
         for entry_datetime, content in entries:
@@ -795,75 +1182,136 @@ class LifeManagementApp:
         self.history_text.insert(tk.END, ''.join(history_buffer))
         self.history_text.config(state=tk.DISABLED)
 
+    @timed('ui.search_journal')
+    def search_journal(self):
+        """Show ranked search hits; clicking a hit jumps to its date in the history"""
+        hits = self.store.search_journal(self.journal_search_var.get())
+        results = self.search_results_text
+        results.config(state=tk.NORMAL)
+        results.delete(1.0, tk.END)
+        if not hits:
+            results.insert(tk.END, "No matching entries.")
+        for i, (entry_id, entry_date, entry_datetime, snippet) in enumerate(hits):
+            hit_tag = f"hit_{i}"
+            results.insert(tk.END, f"{entry_date}  ", ("date", hit_tag))
+            # Alternate plain and highlighted runs between the snippet markers
+            for j, part in enumerate(re.split(f"[{MATCH_START}{MATCH_END}]", snippet or "")):
+                results.insert(tk.END, part, ("match", hit_tag) if j % 2 else (hit_tag,))
+            results.insert(tk.END, "\n\n")
+            results.tag_bind(hit_tag, "<Button-1>", lambda e, d=entry_date: self.show_journal_date(d))
+        results.config(state=tk.DISABLED)
+
+    def show_journal_date(self, date_str: str):
+        """Show the history for a date"""
+        self.history_date_var.set(date_str)
+        self.load_journal_history_for_date()
+
     # Double-click selection is not needed for ScrolledText history
 
+    @timed('ui.edit_task')
     def edit_task(self, event):
-        # Get the index of the clicked item
-        widget = event.widget
-        try:
-            index = widget.curselection()[0]
-        except IndexError:
+        """Edit the double-clicked task's description and save it"""
+        is_daily = event.widget is self.daily_tasks_listbox
+        task = self.task_view(is_daily).selected()
+        if task is None:
             return  # No item selected
 
-        # Get current text
-        current_text = widget.get(index)
-
-        # Ask user for new text
-        new_text = simpledialog.askstring("Edit Task", "Edit the task:", initialvalue=current_text, parent=self.root)
-        if new_text and new_text.strip():
-            # Update the Listbox
-            widget.delete(index)
-            widget.insert(index, new_text)
-            # TODO: Update your database or data structure here as well!
+        # Edit the stored description, not the listbox line with its status glyph
+        new_text = simpledialog.askstring("Edit Task", "Edit the task:", initialvalue=task.description, parent=self.root)
+        if new_text and new_text.strip() and new_text.strip() != task.description:
+            updated = self.store.update_task_description(task, new_text.strip()).result()
+            self.task_view(is_daily).update(updated)
     
-    def get_sorted_journal_dates(self):
-        self.cursor.execute("SELECT DISTINCT date(entry_datetime) FROM journal_entries ORDER BY entry_datetime DESC")
-        return [row[0] for row in self.cursor.fetchall()]
-
     def goto_prev_journal_date(self):
         """Go to the previous available journal date and show entries for that date"""
         current = self.history_date_var.get().strip()
-        dates = self.get_sorted_journal_dates()
-        if not dates:
-            return
-        try:
-            idx = dates.index(current)
-            if idx + 1 < len(dates):
-                self.history_date_var.set(dates[idx + 1])
-                self.load_journal_history_for_date()
-        except ValueError:
-            # If current date not found, go to the most recent
-            self.history_date_var.set(dates[0])
-            self.load_journal_history_for_date()
+        # With no date entered, start from the most recent one
+        target = self.store.journal_date_before(current) if current else self.store.latest_journal_date()
+        if target:
+            self.show_journal_date(target)
 
     def goto_next_journal_date(self):
         """Go to the next available journal date and show entries for that date"""
-        current = self.history_date_var.get().strip() or date.today().isoformat()
-        dates = self.get_sorted_journal_dates()
-        if not dates:
+        current = self.history_date_var.get().strip()
+        target = self.store.journal_date_after(current) if current else self.store.latest_journal_date()
+        if target:
+            self.show_journal_date(target)
+
+    def toggle_metrics_overlay(self):
+        """Show or hide a window listing the slowest recent operations"""
+        if self.metrics_overlay is not None:
+            self.metrics_overlay.destroy()
+            self.metrics_overlay = None
             return
+        window = self.metrics_overlay = tk.Toplevel(self.root)
+        window.title("Slowest Recent Operations")
+        window.geometry("700x400")
+        window.attributes('-topmost', True)
+        window.protocol("WM_DELETE_WINDOW", self.toggle_metrics_overlay)
+        columns = ("ms", "rows", "name")
+        self.metrics_tree = ttk.Treeview(window, columns=columns, show="headings")
+        for column, heading, width in zip(columns, ("ms", "Rows", "Operation"), (80, 60, 520)):
+            self.metrics_tree.heading(column, text=heading)
+            self.metrics_tree.column(column, width=width, stretch=column == "name")
+        self.metrics_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        ttk.Button(window, text="Dump Metrics", command=self.dump_metrics).pack(pady=(0, 10))
+        self.refresh_metrics_overlay()
+
+    def refresh_metrics_overlay(self):
+        if self.metrics_overlay is None:
+            return
+        tree = self.metrics_tree
+        tree.delete(*tree.get_children())
+        for name, ms, rows, _ in metrics.slowest_recent():
+            tree.insert("", tk.END, values=(f"{ms:.2f}", rows, name))
+        self.root.after(1000, self.refresh_metrics_overlay)
+
+    def dump_metrics(self):
+        print(f"Metrics written to {metrics.dump()}")
+
+    def on_close(self):
+        """Save pending edits, then close the window"""
         try:
-            idx = dates.index(current)
-            if idx - 1 >= 0:
-                self.history_date_var.set(dates[idx - 1])
-                self.load_journal_history_for_date()
-        except ValueError:
-            # If current date not found, go to the most recent
-            self.history_date_var.set(dates[0])
-            self.load_journal_history_for_date()
+            self.flush_autosaves()
+        finally:
+            self.root.destroy()
 
     def run(self):
         """Start the application"""
         try:
             self.root.mainloop()
         finally:
-            # Cancel all autosave jobs
-            for job_id in self.autosave_jobs.values():
-                self.root.after_cancel(job_id)
-            self.conn.close()
+            # Abandon a snapshot in progress; the next start takes it again
+            if self.backup_service is not None:
+                self.backup_service.stop()
+            # Give feedback still being generated a moment to finish; anything cut short is saved as far as it got
+            self.cancel_feedback()
+            if self.feedback_service.running():
+                print(f"Waiting up to {FEEDBACK_EXIT_WAIT} seconds for journal feedback to finish...")
+            cut_short = self.feedback_service.shutdown(timeout=FEEDBACK_EXIT_WAIT)
+            if cut_short:
+                print(f"Saved {cut_short} unfinished journal feedback as far as it got")
+            # Commit every queued write, synced to disk so the edit log can go, before exiting
+            self.store.commit_durably().result()
+            if self.sync_thread is not None:
+                # Like the startup sync, the exit sync only runs once the window has been shown
+                from utils.sync import sync_from_env
+                self.sync_thread.join()
+                sync_from_env(self.store)
+            self.store.close()
+            # Everything logged is committed now; only a crash leaves the log non-empty
+            if not self.autosave_jobs:
+                self.edit_log.truncate()
+            self.edit_log.close()
+            if METRICS_ENABLED:
+                self.dump_metrics()
 
 def main():
     """Main function to run"""
+    if len(sys.argv) > 1:
+        # Subcommands (add, tasks, journal, serve, ...) run headless; see utils/cli.py
+        from utils.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     app = LifeManagementApp()
     app.run()
 
@@ -0,0 +1,329 @@
+"""Local JSON HTTP API over the storage layer, for scripts and dashboards.
+
+Runs without Tk on top of one LifeStore: every write goes through its single
+DatabaseWriter, and every request reads through a connection borrowed from
+its reader pool, so concurrent requests never block each other or the writer.
+Writes answer once they are committed. There is no authentication, so it
+binds to localhost unless told otherwise.
+
+Routes:
+    GET    /tasks?daily=0&status=pending&after_created=&after_id=&limit=100
+    POST   /tasks                     {"description", "daily", "category", "priority"}
+    GET    /tasks/<id>
+    PATCH  /tasks/<id>                {"status", "priority", "description"} (any of)
+    DELETE /tasks/<id>
+    POST   /tasks/rollover
+    GET    /journal?date=YYYY-MM-DD
+    GET    /journal/search?q=words&limit=50   (snippets wrap matches in MATCH_START/MATCH_END)
+    POST   /journal                   {"content", "datetime"}
+    GET    /weeks/<week_start>
+    PUT    /weeks/<week_start>        {"days": {"0": "...", ...}, "intentions"}
+    GET    /analytics?start=YYYY-MM-DD&end=YYYY-MM-DD
+
+Usage (from the repository root):
+    python -m utils.cli serve --port 8080
+"""
+import json
+import re
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.sentiment import MATCHER_VERSION, score_text
+from utils.tasks import PRIORITY_LEVELS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+MAX_LIMIT = 1000
+MAX_BODY = 1_000_000  # bytes
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def task_json(task):
+    return task._asdict()
+
+
+def parse_day(value: str, name='date'):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be a YYYY-MM-DD date")
+
+
+def parse_limit(query, default):
+    try:
+        return max(1, min(int(query.get('limit', default)), MAX_LIMIT))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+
+
+def require_text(body, name, default=''):
+    """body[name], which must be a string; absent or null gives `default`"""
+    value = body.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ApiError(400, f"{name} must be a string")
+    return value
+
+
+def parse_priority(value):
+    # Checked by type first: lists and dicts can't be looked up, and True == 1
+    if type(value) is not int or value not in PRIORITY_LEVELS:
+        raise ApiError(400, f"priority must be one of {sorted(PRIORITY_LEVELS)}")
+    return value
+
+
+def require_task(store, task_id: str):
+    task = store.get_task(task_id)
+    if task is None:
+        raise ApiError(404, f"No task {task_id}")
+    return task
+
+
+# Route handlers take (store, path groups, query, body) and return a JSON-able value
+
+def list_tasks(store, groups, query, body):
+    is_daily = query.get('daily', '0') in ('1', 'true')
+    status = query.get('status')
+    if status not in (None, 'pending', 'completed'):
+        raise ApiError(400, "status must be pending or completed")
+    after = None
+    if 'after_created' in query:
+        after = (query['after_created'], query.get('after_id', ''))
+    tasks = store.list_tasks_page(is_daily, status, after, parse_limit(query, 100))
+    return [task_json(task) for task in tasks]
+
+
+def add_task(store, groups, query, body):
+    description = require_text(body, 'description').strip()
+    if not description:
+        raise ApiError(400, "description is required")
+    priority = parse_priority(body.get('priority', 1))
+    daily = body.get('daily', False)
+    if not isinstance(daily, bool):
+        raise ApiError(400, "daily must be true or false")
+    category = require_text(body, 'category').strip() or 'general'
+    task = store.add_task(description, daily, category, priority).result()
+    return task_json(task)
+
+
+def get_task(store, groups, query, body):
+    return task_json(require_task(store, groups[0]))
+
+
+def update_task(store, groups, query, body):
+    task = require_task(store, groups[0])
+    if 'status' in body:
+        if body['status'] not in ('pending', 'completed'):
+            raise ApiError(400, "status must be pending or completed")
+        task = store.set_task_status(task, body['status']).result()
+    if 'priority' in body:
+        task = store.set_tasks_priority([task], parse_priority(body['priority'])).result()[0]
+    if 'description' in body:
+        description = require_text(body, 'description').strip()
+        if not description:
+            raise ApiError(400, "description must not be empty")
+        task = store.update_task_description(task, description).result()
+    return task_json(task)
+
+
+def delete_task(store, groups, query, body):
+    deleted = store.delete_task(groups[0]).result()
+    if not deleted:
+        raise ApiError(404, f"No task {groups[0]}")
+    return {'deleted': groups[0]}
+
+
+def rollover(store, groups, query, body):
+    result = store.rollover_tasks()
+    if result is None:
+        return {'ran': False}
+    returned, archived = result
+    return {'ran': True, 'returned': returned, 'archived': archived}
+
+
+def journal_for_date(store, groups, query, body):
+    day = parse_day(query.get('date', date.today().isoformat()))
+    entries = store.get_journal_entries_for_date(day.isoformat())
+    return [{'entry_datetime': entry_datetime, 'content': content} for entry_datetime, content in entries]
+
+
+def search_journal(store, groups, query, body):
+    hits = store.search_journal(query.get('q', ''), parse_limit(query, 50))
+    return [{'id': entry_id, 'entry_date': entry_date, 'entry_datetime': entry_datetime, 'snippet': snippet}
+            for entry_id, entry_date, entry_datetime, snippet in hits]
+
+
+def add_journal_entry(store, groups, query, body):
+    content = require_text(body, 'content').strip()
+    if not content:
+        raise ApiError(400, "content is required")
+    try:
+        entry_datetime = datetime.fromisoformat(body['datetime']) if body.get('datetime') else datetime.now()
+    except (TypeError, ValueError):
+        raise ApiError(400, "datetime must be ISO 8601, e.g. 2024-05-10T09:30")
+    # Feedback is only generated in the app
+    entry_id = store.add_journal_entry(entry_datetime, content, None).result()
+    store.save_journal_sentiments([(entry_id, *score_text(content), MATCHER_VERSION)]).result()
+    return {'id': entry_id, 'entry_datetime': entry_datetime.isoformat(sep=' ')}
+
+
+def week_start_of(value: str):
+    day = parse_day(value, 'week start')
+    if day.weekday() != 0:
+        raise ApiError(400, "week start must be a Monday")
+    return day.isoformat()
+
+
+def get_week(store, groups, query, body):
+    week_start = week_start_of(groups[0])
+    contents, intentions = store.load_weekly_planning(week_start)
+    return {'week_start': week_start, 'days': {str(day): contents.get(day, '') for day in range(7)},
+            'intentions': intentions or ''}
+
+
+def put_week(store, groups, query, body):
+    week_start = week_start_of(groups[0])
+    days = body.get('days') or {}
+    if not isinstance(days, dict):
+        raise ApiError(400, "days must be an object")
+    # Check everything before saving anything, so a bad request changes nothing
+    for day, content in days.items():
+        if day not in ('0', '1', '2', '3', '4', '5', '6'):
+            raise ApiError(400, "days are keyed 0 (Monday) to 6 (Sunday)")
+        if not isinstance(content, str):
+            raise ApiError(400, f"day {day} must be a string")
+    intentions = require_text(body, 'intentions') if 'intentions' in body else None
+    future = None
+    for day, content in days.items():
+        future = store.save_weekly_day(week_start, int(day), content)
+    if intentions is not None:
+        future = store.save_weekly_intentions(week_start, intentions)
+    if future is not None:
+        future.result()  # the writer commits in order, so the last save covers the rest
+    return get_week(store, groups, query, body)
+
+
+def analytics(store, groups, query, body):
+    end = parse_day(query.get('end', date.today().isoformat()), 'end')
+    start = parse_day(query.get('start', (end - timedelta(days=29)).isoformat()), 'start')
+    by_day = store.get_task_rollups_by_day(start.isoformat(), end.isoformat())
+    by_category = store.get_task_rollups_by_category(start.isoformat(), end.isoformat())
+    return {
+        'days': [{'day': day, 'created': created, 'completed': completed, 'lead_seconds': lead}
+                 for day, created, completed, lead in by_day],
+        'categories': [{'category': category, 'created': created, 'completed': completed, 'lead_seconds': lead}
+                       for category, created, completed, lead in by_category],
+    }
+
+
+ROUTES = [
+    ('GET', r'/tasks', list_tasks),
+    ('POST', r'/tasks', add_task),
+    ('POST', r'/tasks/rollover', rollover),
+    ('GET', r'/tasks/([^/]+)', get_task),
+    ('PATCH', r'/tasks/([^/]+)', update_task),
+    ('DELETE', r'/tasks/([^/]+)', delete_task),
+    ('GET', r'/journal', journal_for_date),
+    ('GET', r'/journal/search', search_journal),
+    ('POST', r'/journal', add_journal_entry),
+    ('GET', r'/weeks/([^/]+)', get_week),
+    ('PUT', r'/weeks/([^/]+)', put_week),
+    ('GET', r'/analytics', analytics),
+]
+ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Dispatches requests to the route handlers, reading through the store's pool"""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so load tests measure requests rather than connects
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    store = None  # set by make_server
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        header = self.headers.get('Content-Length')
+        if header is None and self.headers.get('Transfer-Encoding') is None:
+            return {}  # no body at all
+        # On any rejected body its bytes are left unread, so the connection can't serve another request
+        if header is None or not (header.isascii() and header.isdigit()):
+            self.close_connection = True
+            raise ApiError(400, "a body needs a valid Content-Length")
+        length = int(header)
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise ApiError(413, "request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "body must be a JSON object")
+        return body
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            body = self._body()
+            methods = []
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.match(url.path)
+                if match is None:
+                    continue
+                methods.append(route_method)
+                if route_method == method:
+                    with self.store.reading():
+                        self._reply(handler(self.store, match.groups(), query, body))
+                    return
+            raise ApiError(405 if methods else 404, f"{method} not allowed" if methods else "not found")
+        except ApiError as e:
+            self._reply({'error': str(e)}, e.status)
+        except RuntimeError as e:
+            self._reply({'error': str(e)}, 503)  # writer closed during shutdown
+        except Exception as e:
+            print(f"{method} {url.path} failed: {e}")
+            self._reply({'error': 'internal error'}, 500)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        pass  # keep the console for errors
+
+
+def make_server(store, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Build a threaded API server over `store`; port 0 picks a free one"""
+    handler = type('BoundApiRequestHandler', (ApiRequestHandler,), {'store': store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,205 @@
+"""Online backups with the SQLite backup API, plus rotation and restore.
+
+BackupService copies the live database a few pages at a time from its own
+read-only connection on a background thread, so the Tk loop and the writer
+never wait on it. Each snapshot is written to a temporary file, checked with
+PRAGMA integrity_check, and only then renamed into place. One snapshot is
+kept per day and one per ISO week, pruned to the newest DAILY_KEEP and
+WEEKLY_KEEP.
+
+Usage (from the repository root, with the app closed for restore):
+    python -m utils.backup list
+    python -m utils.backup backup
+    python -m utils.backup restore backups/life_management-daily-2024-05-10.db
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+BACKUP_DIR = 'backups'
+DAILY_KEEP = 7
+WEEKLY_KEEP = 4
+PAGES_PER_STEP = 256  # 1 MB at the default 4 KB page size
+STEP_SLEEP = 0.005  # seconds between steps, to leave the disk to the writer
+CHECK_INTERVAL = 3600  # seconds between checks for a due snapshot
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def integrity_check(path: str):
+    """Return None if the database at `path` is sound, else SQLite's first complaint"""
+    # immutable: a snapshot is never written, and SQLite then creates no -shm/-wal beside it
+    conn = sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    return None if result == 'ok' else result
+
+
+def copy_database(source_path: str, target_path: str, pages=PAGES_PER_STEP, sleep=STEP_SLEEP, cancel_event=None,
+                  standalone=False):
+    """Copy a database page batch by page batch with Connection.backup.
+
+    The copy inherits the source's WAL journal mode; `standalone` switches it
+    to a rollback journal, so the copy is one self-contained file.
+    """
+    def progress(status, remaining, total):
+        if cancel_event is not None and cancel_event.is_set():
+            raise BackupCancelled()
+
+    source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    try:
+        # Pin one WAL snapshot for the whole copy; otherwise every commit by
+        # the writer between steps would restart the backup from page one
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+        source.execute("COMMIT")
+        if standalone:
+            target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+class BackupService:
+    """Takes due daily and weekly snapshots of a database in the background"""
+
+    def __init__(self, db_path: str, backup_dir=BACKUP_DIR, daily_keep=DAILY_KEEP, weekly_keep=WEEKLY_KEEP):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep = {'daily': daily_keep, 'weekly': weekly_keep}
+        self.stem = os.path.splitext(os.path.basename(db_path))[0]
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def snapshot_path(self, kind: str, label: str) -> str:
+        return os.path.join(self.backup_dir, f'{self.stem}-{kind}-{label}.db')
+
+    def snapshots(self, kind: str):
+        """Existing snapshots of a kind, newest first"""
+        # ISO dates and ISO weeks both sort chronologically as text
+        return sorted(glob.glob(os.path.join(self.backup_dir, f'{self.stem}-{kind}-*.db')), reverse=True)
+
+    def due_snapshots(self, today=None):
+        """Return the snapshot paths that don't exist yet for today and this week"""
+        today = today or date.today()
+        year, week, _ = today.isocalendar()
+        paths = [self.snapshot_path('daily', today.isoformat()),
+                 self.snapshot_path('weekly', f'{year}-W{week:02d}')]
+        return [path for path in paths if not os.path.exists(path)]
+
+    def take_snapshot(self, path: str):
+        """Back up into `path`; returns True if it was written and passed the integrity check"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        try:
+            copy_database(self.db_path, partial, cancel_event=self._stopping, standalone=True)
+            problem = integrity_check(partial)
+        except BackupCancelled:
+            os.remove(partial)
+            return False
+        except Exception as e:
+            print(f"Backup to {path} failed: {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
+            return False
+        if problem is not None:
+            print(f"Backup to {path} failed the integrity check: {problem}")
+            os.remove(partial)
+            return False
+        os.replace(partial, path)
+        return True
+
+    def prune(self):
+        """Delete the snapshots beyond each kind's retention count, and any leftover side files"""
+        for kind, keep in self.keep.items():
+            for path in self.snapshots(kind)[keep:]:
+                os.remove(path)
+        pattern = os.path.join(self.backup_dir, f'{self.stem}-*.db')
+        leftovers = glob.glob(pattern + '-wal') + glob.glob(pattern + '-shm')
+        # Only stale partial copies, so one still being written by another process survives
+        stale = time.time() - CHECK_INTERVAL
+        leftovers += [path for path in glob.glob(pattern + '.partial*') if os.path.getmtime(path) < stale]
+        for path in leftovers:
+            os.remove(path)
+
+    def run_due(self, today=None):
+        """Take every due snapshot, then prune; returns the paths written"""
+        written = []
+        for path in self.due_snapshots(today):
+            if self._stopping.is_set():
+                break
+            if self.take_snapshot(path):
+                written.append(path)
+        self.prune()
+        return written
+
+    def start(self, interval=CHECK_INTERVAL):
+        """Check for due snapshots now and then every `interval` seconds on a daemon thread"""
+        def run():
+            while not self._stopping.is_set():
+                self.run_due()
+                self._stopping.wait(interval)
+        self._thread = threading.Thread(target=run, name='backup', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Cancel a snapshot in progress and stop the thread"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def restore(snapshot_path: str, db_path: str):
+    """Replace the database with a verified snapshot, keeping the current one aside.
+
+    The app must be closed. Returns the path the previous database was saved to.
+    """
+    problem = integrity_check(snapshot_path)
+    if problem is not None:
+        raise ValueError(f"{snapshot_path} failed the integrity check: {problem}")
+    saved = f"{db_path}.pre-restore-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    if os.path.exists(db_path):
+        copy_database(db_path, saved, sleep=0, standalone=True)
+    # Copying into the live file through SQLite keeps its WAL consistent
+    copy_database(snapshot_path, db_path, sleep=0)
+    return saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Back up or restore the Life360 database")
+    parser.add_argument('command', choices=['list', 'backup', 'restore'])
+    parser.add_argument('snapshot', nargs='?', help="snapshot to restore")
+    parser.add_argument('--db', default='life_management.db', help="database path")
+    parser.add_argument('--dir', default=BACKUP_DIR, help="snapshot directory")
+    args = parser.parse_args(argv)
+
+    service = BackupService(args.db, args.dir)
+    if args.command == 'list':
+        for kind in service.keep:
+            for path in service.snapshots(kind):
+                print(f"{kind:<7} {path}  {os.path.getsize(path) / 1e6:.1f} MB")
+    elif args.command == 'backup':
+        for path in service.run_due():
+            print(f"Wrote {path}")
+    else:
+        if not args.snapshot:
+            parser.error("restore needs a snapshot path")
+        saved = restore(args.snapshot, args.db)
+        print(f"Restored {args.db} from {args.snapshot}; the previous database is at {saved}")
+
+
+if __name__ == "__main__":
+    main()
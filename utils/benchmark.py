@@ -0,0 +1,189 @@
+"""Headless benchmarks for the storage layer.
+
+Seeds synthetic databases of increasing size and times the hot storage
+operations the app runs on every click, keystroke and autosave.
+
+Usage (from the repository root):
+    python -m utils.benchmark                          # 10k, 100k and 1M rows
+    python -m utils.benchmark --sizes 10000 --repeat 50
+    python -m utils.benchmark --data-dir /tmp/bench --keep
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+
+from utils.storage import LifeStore, PRIORITY_CATEGORIES
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+SEED_CHUNK = 10_000
+WORDS = ['plan', 'review', 'call', 'write', 'gym', 'budget', 'read', 'ship', 'fix', 'email',
+         'grateful', 'progress', 'stressed', 'behind', 'proud', 'family', 'walk', 'prayer']
+
+
+def _sentence(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def seed_database(path, rows, seed=42):
+    """Create a database at `path` with `rows` tasks, journal entries and weekly planning rows"""
+    rng = random.Random(seed)
+    store = LifeStore(path)
+    start = datetime(2015, 1, 1, 6, 0)
+
+    def chunks(make_row):
+        for offset in range(0, rows, SEED_CHUNK):
+            yield [make_row(i) for i in range(offset, min(offset + SEED_CHUNK, rows))]
+
+    def task_row(i):
+        created_at = start + timedelta(minutes=7 * i)
+        completed = rng.random() < 0.6
+        return (str(uuid.UUID(int=rng.getrandbits(128))), _sentence(rng, 5), 'general',
+                rng.randint(1, 3), 'completed' if completed else 'pending', i % 100 == 0,
+                created_at.isoformat(), (created_at + timedelta(days=2)).isoformat() if completed else None)
+
+    def journal_row(i):
+        # Roughly three entries per day
+        entry_datetime = start + timedelta(hours=8 * i)
+        return (entry_datetime.isoformat(sep=' '), entry_datetime.date().isoformat(),
+                _sentence(rng, 60), _sentence(rng, 30), uuid.UUID(int=rng.getrandbits(128)).hex)
+
+    def weekly_row(i):
+        week_start = date(2000, 1, 3) + timedelta(weeks=i // 7)
+        return (week_start.isoformat(), i % 7, _sentence(rng, 20), _sentence(rng, 10))
+
+    for batch in chunks(task_row):
+        store.writer.executemany(
+            """INSERT INTO tasks
+               (id, description, category, priority, status, is_daily, created_at, completed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", batch).result()
+    for batch in chunks(journal_row):
+        store.writer.executemany(
+            "INSERT INTO journal_entries (entry_datetime, entry_date, content, feedback, uid) VALUES (?, ?, ?, ?, ?)",
+            batch).result()
+    for batch in chunks(weekly_row):
+        store.writer.executemany(
+            "INSERT OR REPLACE INTO weekly_planning (week_start, day_index, content) VALUES (?, ?, ?)",
+            [row[:3] for row in batch]).result()
+        store.writer.executemany(
+            "INSERT OR REPLACE INTO weekly_intentions (week_start, intentions) VALUES (?, ?)",
+            [(row[0], row[3]) for row in batch if row[1] == 0]).result()
+    store.save_priorities({category: _sentence(rng, 8) for category in PRIORITY_CATEGORIES})
+    store.save_affirmations(_sentence(rng, 40))
+    store.close()
+
+
+def _operations(rng, rows):
+    """Return (name, callable(store)) pairs for every timed operation"""
+    start = datetime(2015, 1, 1, 6, 0)
+    last_day = (start + timedelta(hours=8 * max(rows - 1, 0))).date()
+    weeks = max(rows // 7, 1)
+
+    def random_day():
+        return (start.date() + timedelta(days=rng.randrange((last_day - start.date()).days + 1))).isoformat()
+
+    def random_week():
+        return (date(2000, 1, 3) + timedelta(weeks=rng.randrange(weeks))).isoformat()
+
+    def toggle_task(store):
+        task = store.add_task(_sentence(rng, 4), False).result()
+        return store.set_task_status(task, 'completed')
+
+    def autosave_burst(store):
+        # 50 debounced saves land in the queue before the writer wakes up
+        for _ in range(50):
+            store.save_affirmations(_sentence(rng, 40))
+            store.save_priorities({category: _sentence(rng, 8) for category in PRIORITY_CATEGORIES})
+        store.flush()
+
+    return [
+        ('add_task', lambda store: store.add_task(_sentence(rng, 4), False)),
+        ('set_task_status', toggle_task),
+        ('list_tasks(daily)', lambda store: store.list_tasks(True)),
+        ('list_tasks(backlog)', lambda store: store.list_tasks(False)),
+        ('list_tasks_page(backlog)', lambda store: store.list_tasks_page(False, 'pending', None, 100)),
+        ('add_journal_entry', lambda store: store.add_journal_entry(
+            datetime.combine(date.fromisoformat(random_day()), datetime.min.time()), _sentence(rng, 60), '')),
+        ('get_journal_entry', lambda store: store.get_journal_entry(random_day())),
+        ('get_journal_entries_for_date', lambda store: store.get_journal_entries_for_date(random_day())),
+        ('get_journal_dates', lambda store: store.get_journal_dates()),
+        ('journal_date_before', lambda store: store.journal_date_before(random_day())),
+        ('search_journal', lambda store: store.search_journal(f"{rng.choice(WORDS)} {rng.choice(WORDS)}")),
+        ('save_weekly_planning', lambda store: store.save_weekly_planning(
+            random_week(), [_sentence(rng, 20) for _ in range(7)], _sentence(rng, 10))),
+        ('save_weekly_day', lambda store: store.save_weekly_day(random_week(), rng.randrange(7), _sentence(rng, 20))),
+        ('load_weekly_planning', lambda store: store.load_weekly_planning(random_week())),
+        ('save_priorities', lambda store: store.save_priorities(
+            {category: _sentence(rng, 8) for category in PRIORITY_CATEGORIES})),
+        ('save_affirmations', lambda store: store.save_affirmations(_sentence(rng, 40))),
+        ('autosave_burst(x50)', autosave_burst),
+    ]
+
+
+def run_benchmarks(path, rows, repeat, seed=7):
+    """Time every operation against the database at `path` and return result dicts"""
+    rng = random.Random(seed)
+    store = LifeStore(path)
+    results = []
+    try:
+        for name, operation in _operations(rng, rows):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = operation(store)
+                if isinstance(result, Future):
+                    result.result()  # time writes until they are committed
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results.append({
+                'rows': rows,
+                'operation': name,
+                'min_ms': timings[0],
+                'median_ms': statistics.median(timings),
+                'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            })
+    finally:
+        store.close()
+    return results
+
+
+def print_results(results):
+    """Print benchmark results as an aligned table"""
+    print(f"{'rows':>10}  {'operation':<32}{'min ms':>10}{'median ms':>12}{'p95 ms':>10}")
+    for result in results:
+        print(f"{result['rows']:>10}  {result['operation']:<32}{result['min_ms']:>10.3f}"
+              f"{result['median_ms']:>12.3f}{result['p95_ms']:>10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Life360 storage layer headlessly")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="row counts to seed per table (default: 10k 100k 1M)")
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per operation")
+    parser.add_argument('--data-dir', help="directory for the seeded databases (default: a temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep and reuse seeded databases between runs")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='life360-bench-')
+    os.makedirs(data_dir, exist_ok=True)
+    for rows in args.sizes:
+        path = os.path.join(data_dir, f'life_bench_{rows}.db')
+        if not (args.keep and os.path.exists(path)):
+            if os.path.exists(path):
+                os.remove(path)
+            started = time.perf_counter()
+            seed_database(path, rows)
+            print(f"Seeded {rows} rows per table in {time.perf_counter() - started:.1f}s")
+        print_results(run_benchmarks(path, rows, args.repeat))
+        print()
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Headless command line for quick capture, cron jobs and the HTTP API.
+
+Works on the same database as the app without opening a window, so it can run
+from a terminal, cron or a server with no display.
+
+Usage (from the repository root; `python index.py <command> ...` works too):
+    python -m utils.cli add "Call the bank" --daily --priority 2
+    python -m utils.cli tasks --daily
+    python -m utils.cli done 3f2a9c1e-...
+    python -m utils.cli journal "Good focus today"
+    python -m utils.cli entries --date 2024-05-10
+    python -m utils.cli week
+    python -m utils.cli rollover                      # e.g. from cron at 00:05
+    python -m utils.cli serve --port 8080             # see utils/api.py for routes
+"""
+import argparse
+from datetime import date, datetime, timedelta
+
+from utils.api import DEFAULT_HOST, DEFAULT_PORT, make_server
+from utils.readers import POOL_SIZE
+from utils.sentiment import MATCHER_VERSION, score_text
+from utils.storage import LifeStore
+from utils.tasks import PRIORITY_LEVELS, STATUS_FILTERS, display_text
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def add_task(store, args):
+    task = store.add_task(args.description, args.daily, args.category, args.priority).result()
+    print(task.id)
+
+
+def list_tasks(store, args):
+    status = None if args.status == 'all' else args.status
+    for task in store.list_tasks_page(args.daily, status, None, args.limit):
+        print(f"{task.id}  {display_text(task)}")
+
+
+def set_status(status):
+    def run(store, args):
+        task = store.get_task(args.task_id)
+        if task is None:
+            print(f"No task {args.task_id}")
+            return 1
+        print(display_text(store.set_task_status(task, status).result()))
+    return run
+
+
+def delete_task(store, args):
+    if not store.delete_task(args.task_id).result():
+        print(f"No task {args.task_id}")
+        return 1
+
+
+def add_journal_entry(store, args):
+    entry_datetime = args.at or datetime.now()
+    entry_id = store.add_journal_entry(entry_datetime, args.content, None).result()
+    store.save_journal_sentiments([(entry_id, *score_text(args.content), MATCHER_VERSION)]).result()
+    print(f"Saved entry {entry_id} at {entry_datetime:%Y-%m-%d %H:%M}")
+
+
+def list_entries(store, args):
+    for entry_datetime, content in store.get_journal_entries_for_date((args.date or date.today()).isoformat()):
+        print(f"[{entry_datetime}]\n{content}\n")
+
+
+def show_week(store, args):
+    day = args.week or date.today()
+    week_start = day - timedelta(days=day.weekday())
+    contents, intentions = store.load_weekly_planning(week_start.isoformat())
+    print(f"Week of {week_start.isoformat()}")
+    if intentions:
+        print(f"Intentions: {intentions}")
+    for index, name in enumerate(DAY_NAMES):
+        print(f"{name:<10} {contents.get(index) or ''}")
+
+
+def rollover(store, args):
+    result = store.rollover_tasks()
+    if result is None:
+        print("Already rolled over today")
+    else:
+        print(f"Returned {result[0]} daily tasks to the backlog, archived {result[1]} completed tasks")
+
+
+def serve(store, args):
+    # Without this, search and analytics leave out history from before those migrations
+    store.start_background_catch_up()
+    server = make_server(store, args.host, args.port)
+    print(f"Life360 API listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='life360', description="Use the Life360 database without the window")
+    parser.add_argument('--db', default='life_management.db', help="database path")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('add', help="add a task")
+    command.add_argument('description')
+    command.add_argument('--daily', action='store_true', help="add to today's tasks instead of the backlog")
+    command.add_argument('--category', default='general')
+    command.add_argument('--priority', type=int, choices=sorted(PRIORITY_LEVELS), default=1)
+    command.set_defaults(run=add_task)
+
+    command = commands.add_parser('tasks', help="list tasks")
+    command.add_argument('--daily', action='store_true', help="list today's tasks instead of the backlog")
+    command.add_argument('--status', choices=STATUS_FILTERS, default='pending')
+    command.add_argument('--limit', type=int, default=100)
+    command.set_defaults(run=list_tasks)
+
+    for name, status in (('done', 'completed'), ('reopen', 'pending')):
+        command = commands.add_parser(name, help=f"mark a task {status}")
+        command.add_argument('task_id')
+        command.set_defaults(run=set_status(status))
+
+    command = commands.add_parser('delete', help="delete a task")
+    command.add_argument('task_id')
+    command.set_defaults(run=delete_task)
+
+    command = commands.add_parser('journal', help="write a journal entry")
+    command.add_argument('content')
+    command.add_argument('--at', type=datetime.fromisoformat, help="entry time, e.g. 2024-05-10T09:30 (default: now)")
+    command.set_defaults(run=add_journal_entry)
+
+    command = commands.add_parser('entries', help="show a day's journal entries")
+    command.add_argument('--date', type=date.fromisoformat, help="YYYY-MM-DD (default: today)")
+    command.set_defaults(run=list_entries)
+
+    command = commands.add_parser('week', help="show a week's planning")
+    command.add_argument('--week', type=date.fromisoformat, help="any day in the week, YYYY-MM-DD (default: this week)")
+    command.set_defaults(run=show_week)
+
+    command = commands.add_parser('rollover', help="start today's task lists, once per day")
+    command.set_defaults(run=rollover)
+
+    command = commands.add_parser('serve', help="run the local HTTP API")
+    command.add_argument('--host', default=DEFAULT_HOST)
+    command.add_argument('--port', type=int, default=DEFAULT_PORT)
+    command.add_argument('--pool-size', type=int, default=POOL_SIZE, help="read connections shared by requests")
+    command.set_defaults(run=serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = LifeStore(args.db, reader_pool_size=getattr(args, 'pool_size', POOL_SIZE))
+    try:
+        return args.run(store, args) or 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
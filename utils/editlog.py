@@ -0,0 +1,160 @@
+"""Append-only journal of unsaved text edits.
+
+Every change to an autosaved widget is appended here as one NDJSON line before
+its debounced database save is even scheduled. Lines reach the OS with each
+write and are fsynced at most once per FSYNC_INTERVAL, so a keystroke costs
+one small sequential write. A widget's first record after a truncation holds
+its whole text and later ones only the change from the text logged before,
+so typing into a long entry doesn't rewrite it per key. Once the database has
+durably committed everything that was logged, the file is truncated; whatever
+is still in it at startup is replayed into the database, so a crash loses
+nothing the log has seen.
+"""
+import json
+import os
+import threading
+
+FSYNC_INTERVAL = 1.0  # seconds between fsyncs while edits are arriving
+
+
+def text_delta(old: str, new: str):
+    """Return (start, removed, inserted) such that new == old[:start] + inserted + old[start + removed:]"""
+    # Binary searches over slice comparisons, which run in C, for the common prefix and then suffix
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    start = low
+    low, high = 0, min(len(old), len(new)) - start
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:] == new[len(new) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return start, len(old) - start - low, new[start:len(new) - low]
+
+
+class EditLog:
+    """Sequence-numbered edit records in an append-only file"""
+
+    def __init__(self, path: str, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.last_seq = 0
+        self._texts = {}  # (op, *target args) -> text last logged for it since the last truncation
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._closed = threading.Event()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._syncer = threading.Thread(target=self._sync_loop, name='edit-log-fsync', daemon=True)
+        self._syncer.start()
+
+    def read(self):
+        """Return the (op, args) records left in the log, oldest first, with deltas applied to full text"""
+        records = []
+        texts = {}
+        with self._lock, open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+                op, args = record['op'], record['args']
+                if 'delta' in record:
+                    text = texts.get((op, *args))
+                    if text is None:
+                        continue
+                    start, removed, inserted = record['delta']
+                    args = [*args, text[:start] + inserted + text[start + removed:]]
+                texts[(op, *args[:-1])] = args[-1]
+                records.append((op, args))
+        return records
+
+    def append(self, op: str, *args):
+        """Log one edit and return its sequence number"""
+        with self._lock:
+            self.last_seq += 1
+            self._file.write(json.dumps({'seq': self.last_seq, 'op': op, 'args': args}, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self._dirty.set()
+            return self.last_seq
+
+    def append_text(self, op: str, target, text: str):
+        """Log the new text of the widget `target` identifies, as a delta when possible.
+
+        Returns the sequence number, or None if the text is what was last logged.
+        """
+        key = (op, *target)
+        with self._lock:
+            previous = self._texts.get(key)
+            if previous == text:
+                return None
+            self.last_seq += 1
+            record = {'seq': self.last_seq, 'op': op, 'args': [*target]}
+            if previous is None:
+                record['args'].append(text)
+            else:
+                record['delta'] = text_delta(previous, text)
+            self._texts[key] = text
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self._dirty.set()
+            return self.last_seq
+
+    def truncate_if_current(self, seq: int):
+        """Empty the log if nothing was appended after `seq`; later edits keep it until the next checkpoint"""
+        with self._lock:
+            if self.last_seq == seq:
+                self._truncate()
+
+    def truncate(self):
+        with self._lock:
+            self._truncate()
+
+    def _truncate(self):
+        self._texts.clear()  # deltas need their base in the file
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
+        self._dirty.clear()
+
+    def _sync_loop(self):
+        while not self._closed.is_set():
+            self._dirty.wait()
+            if self._closed.wait(self.fsync_interval):
+                break
+            with self._lock:
+                if self._dirty.is_set() and not self._file.closed:
+                    os.fsync(self._file.fileno())
+                    self._dirty.clear()
+
+    def close(self):
+        self._closed.set()
+        self._dirty.set()  # wake the syncer so it can exit
+        self._syncer.join()
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def replay_edit_log(store, records):
+    """Queue the latest logged text for every widget target; returns how many were replayed"""
+    saves = {
+        'priority': store.save_priority,
+        'affirmations': store.save_affirmations,
+        'weekly_day': store.save_weekly_day,
+        'weekly_intentions': store.save_weekly_intentions,
+    }
+    latest = {}
+    for op, args in records:
+        if op in saves:
+            # Everything but the text identifies the target; the last edit wins
+            latest[(op, *args[:-1])] = (op, args)
+    for op, args in latest.values():
+        saves[op](*args)
+    return len(latest)
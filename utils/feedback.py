@@ -0,0 +1,364 @@
+"""Journal feedback backends and the worker pool that runs them off the Tk thread.
+
+A backend turns a reflection plus the user's goal priorities into feedback,
+yielded as a stream of text chunks. FeedbackService runs backends on a few
+daemon worker threads; the app polls each FeedbackJob from `root.after` and
+appends chunks to the feedback pane as they arrive. A job the app stops
+polling still runs to the end and hands its text to `on_complete`; on exit,
+jobs get a bounded wait and are then saved as far as they got.
+"""
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+
+from utils.metrics import span
+from utils.sentiment import default_matcher
+
+DEFAULT_TIMEOUT = 120  # seconds for a whole feedback run
+DEFAULT_OLLAMA_URL = 'http://localhost:11434'
+DEFAULT_OLLAMA_MODEL = 'llama3'
+CACHE_MEMORY_ENTRIES = 128
+CACHE_MAX_BYTES = 5_000_000  # on-disk cache budget
+CUT_SHORT_NOTE = "\n\n(Feedback was cut short when the app closed.)"
+
+
+class FeedbackCancelled(Exception):
+    pass
+
+
+class FeedbackBackend:
+    """Produces feedback for a reflection as a stream of text chunks"""
+    name = 'base'
+    version = '1'
+
+    def stream(self, reflection: str, goal_priorities, cancel_event):
+        """Yield feedback chunks; stop early once `cancel_event` is set"""
+        raise NotImplementedError
+
+
+class KeywordFeedbackBackend(FeedbackBackend):
+    """Instant, offline feedback from keyword heuristics"""
+    name = 'keyword'
+    version = '2'  # whole-word matching
+
+    def __init__(self, matcher=default_matcher):
+        self.matcher = matcher
+
+    def stream(self, reflection: str, goal_priorities, cancel_event):
+        goal_context = ", ".join([f"{cat}: {desc}" for cat, desc in goal_priorities])
+
+        counts = self.matcher.count(reflection)
+        has_positive = counts['positive'] > 0
+        has_challenges = counts['challenge'] > 0
+
+        yield "**Reflection Analysis:**\n\n"
+
+        if has_positive:
+            yield "✅ Great to see positive momentum! Your reflection shows growth and accomplishment.\n\n"
+
+        if has_challenges:
+            yield "🎯 I notice some challenges mentioned. Remember that obstacles are opportunities for growth.\n\n"
+
+        yield "**Alignment Check:**\n"
+        if goal_context:
+            yield f"Your current goals ({goal_context}) provide a strong foundation. Consider how today's experiences connect to these priorities.\n\n"
+        else:
+            yield "Consider setting clear life priorities to better align your daily actions with your long-term goals.\n\n"
+
+        yield "**Actionable Suggestions:**\n"
+        yield "• Identify one small win from today to build momentum\n"
+        yield "• Choose one area from your priorities to focus on tomorrow\n"
+        yield "• Practice gratitude for progress made, however small\n"
+        yield "• Reflect on lessons learned from today's challenges"
+
+
+def build_prompt(reflection: str, goal_priorities) -> str:
+    """Prompt for model-backed feedback"""
+    goals = "\n".join(f"- {cat}: {desc}" for cat, desc in goal_priorities) or "- (none set yet)"
+    return (
+        "You are a supportive coach reviewing a daily journal reflection.\n"
+        f"The writer's life priorities are:\n{goals}\n\n"
+        f"Reflection:\n{reflection}\n\n"
+        "Reply with a short analysis, how today lines up with the priorities, "
+        "and two or three concrete suggestions for tomorrow."
+    )
+
+
+class OllamaFeedbackBackend(FeedbackBackend):
+    """Streams feedback from a local Ollama-compatible /api/generate endpoint"""
+    name = 'ollama'
+
+    def __init__(self, url=DEFAULT_OLLAMA_URL, model=DEFAULT_OLLAMA_MODEL, timeout=30):
+        self.url = url.rstrip('/')
+        self.model = model
+        self.timeout = timeout  # seconds to wait for each read from the server
+
+    @property
+    def version(self):
+        return f'{self.model}@{self.url}'
+
+    def stream(self, reflection: str, goal_priorities, cancel_event):
+        body = json.dumps({
+            'model': self.model,
+            'prompt': build_prompt(reflection, goal_priorities),
+            'stream': True,
+        }).encode()
+        request = urllib.request.Request(f'{self.url}/api/generate', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            # One JSON object per line: {"response": "<token>", "done": false}
+            for line in response:
+                if cancel_event.is_set():
+                    return
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message.get('error'):
+                    raise RuntimeError(message['error'])
+                if message.get('response'):
+                    yield message['response']
+                if message.get('done'):
+                    return
+
+
+def backend_from_env():
+    """Pick the feedback backend from LIFE360_FEEDBACK_BACKEND (keyword or ollama)"""
+    if os.environ.get('LIFE360_FEEDBACK_BACKEND', 'keyword') == 'ollama':
+        return OllamaFeedbackBackend(
+            url=os.environ.get('LIFE360_OLLAMA_URL', DEFAULT_OLLAMA_URL),
+            model=os.environ.get('LIFE360_OLLAMA_MODEL', DEFAULT_OLLAMA_MODEL),
+        )
+    return KeywordFeedbackBackend()
+
+
+class FeedbackCache:
+    """Generated feedback keyed on (normalized reflection, priorities, generator version).
+
+    A small in-memory LRU sits in front of the feedback_cache table, which is
+    trimmed to `max_bytes` by evicting the least recently used rows.
+    """
+
+    def __init__(self, store, memory_entries=CACHE_MEMORY_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.store = store
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(reflection: str, goal_priorities, generator_version: str) -> str:
+        normalized = ' '.join(reflection.split())
+        payload = json.dumps([normalized, sorted(goal_priorities), generator_version])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Return cached feedback, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+        feedback = self.store.get_cached_feedback(key)
+        with self._lock:
+            if feedback is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, feedback)
+        return feedback
+
+    def put(self, key: str, feedback: str):
+        with self._lock:
+            self._remember(key, feedback)
+        self.store.put_cached_feedback(key, feedback, self.max_bytes)
+
+    def _remember(self, key, feedback):
+        self._memory[key] = feedback
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """Hit and miss counters since startup"""
+        with self._lock:
+            return {'memory_hits': self.memory_hits, 'disk_hits': self.disk_hits,
+                    'misses': self.misses, 'memory_entries': len(self._memory)}
+
+
+class FeedbackJob:
+    """Handle for one running feedback request.
+
+    The worker pushes chunks onto a queue; `drain()` is called from the Tk
+    thread and never blocks. The finished text goes to `on_complete` once.
+    """
+
+    def __init__(self, on_complete=None):
+        self.cancel_event = threading.Event()
+        self.future = Future()
+        self.chunks = queue.Queue()
+        self.text = ''
+        self.produced = []  # every chunk so far, for saving; `chunks` is the pane's copy
+        self.on_complete = on_complete
+        self._completed = False
+        self._complete_lock = threading.Lock()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def complete(self, text: str):
+        """Hand `text` to on_complete unless that already happened"""
+        with self._complete_lock:
+            if self._completed:
+                return
+            self._completed = True
+        if self.on_complete is not None:
+            self.on_complete(text)
+
+    def save_partial(self):
+        """Hand whatever was generated before a cancel to on_complete, marked as cut short"""
+        if self.produced:
+            self.complete(''.join(self.produced) + CUT_SHORT_NOTE)
+
+    def drain(self):
+        """Return the chunks received since the last call"""
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.chunks.get_nowait())
+            except queue.Empty:
+                break
+        self.text += ''.join(chunks)
+        return chunks
+
+    @property
+    def finished(self):
+        """True once the worker is done; drain() after this returns the last chunks"""
+        return self.future.done()
+
+    def error(self):
+        """The exception that ended the run, if any"""
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+
+class FeedbackService:
+    """Runs a FeedbackBackend on a few worker threads with an overall timeout.
+
+    The workers are daemon threads, so a backend stuck in a network read can
+    never hold up the process exiting.
+    """
+
+    def __init__(self, backend=None, max_workers=2, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.backend = backend or KeywordFeedbackBackend()
+        self.timeout = timeout
+        self.cache = cache
+        self._queue = queue.Queue()
+        self._jobs = set()  # requested and not yet finished
+        self._jobs_lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, name=f'feedback-{number}', daemon=True)
+                         for number in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def request(self, reflection: str, goal_priorities, on_complete=None):
+        """Start generating feedback and return its FeedbackJob.
+
+        `on_complete(text)` is called with the full feedback once it is ready,
+        on the worker thread, whether or not anyone is still polling the job.
+        """
+        job = FeedbackJob(on_complete)
+        goal_priorities = list(goal_priorities)
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(reflection, goal_priorities, f'{self.backend.name}:{self.backend.version}')
+            cached = self.cache.get(key)
+            if cached is not None:
+                # Served from cache: the job is finished before the first poll
+                job.chunks.put(cached)
+                job.complete(cached)
+                job.future.set_result(None)
+                return job
+        with self._jobs_lock:
+            self._jobs.add(job)
+        job.future.add_done_callback(lambda future: self._forget(job))
+        self._queue.put((job, reflection, goal_priorities, key))
+        return job
+
+    def _forget(self, job):
+        with self._jobs_lock:
+            self._jobs.discard(job)
+
+    def running(self):
+        """Number of requested jobs that have not finished"""
+        with self._jobs_lock:
+            return len(self._jobs)
+
+    def _work(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            job = request[0]
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                with span(f'feedback.generate {self.backend.name}'):
+                    self._stream(*request)
+            except Exception as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(None)
+
+    def _stream(self, job, reflection, goal_priorities, key):
+        deadline = time.monotonic() + self.timeout
+        for chunk in self.backend.stream(reflection, goal_priorities, job.cancel_event):
+            if job.cancelled:
+                job.save_partial()
+                raise FeedbackCancelled()
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Feedback took longer than {self.timeout} seconds")
+            job.produced.append(chunk)
+            job.chunks.put(chunk)
+        if job.cancelled:
+            job.save_partial()
+            return
+        text = ''.join(job.produced)
+        if key is not None:
+            self.cache.put(key, text)
+        job.complete(text)
+
+    def generate(self, reflection: str, goal_priorities) -> str:
+        """Run the backend synchronously and return the full feedback text"""
+        return ''.join(self.backend.stream(reflection, list(goal_priorities), threading.Event()))
+
+    def shutdown(self, timeout=0):
+        """Stop the workers, giving unfinished jobs up to `timeout` seconds first.
+
+        Jobs still unfinished then are cancelled and their partial text saved
+        (a worker stuck in a read may never get to it); returns how many.
+        """
+        with self._jobs_lock:
+            jobs = list(self._jobs)
+        wait([job.future for job in jobs], timeout)
+        cut_short = [job for job in jobs if not job.future.done()]
+        for job in cut_short:
+            job.cancel()
+            job.save_partial()
+        for _ in self._workers:
+            self._queue.put(None)
+        return len(cut_short)
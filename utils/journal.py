@@ -0,0 +1,38 @@
+"""Sorted index of the dates that have journal entries.
+
+History navigation asks for the nearest date before or after the one on
+screen; with the dates held in a sorted list each step is a bisect, however
+many years of entries there are.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+
+class JournalDateIndex:
+    """Distinct ISO dates in ascending order with O(log n) neighbour lookups"""
+
+    def __init__(self, dates=()):
+        self._dates = sorted(set(dates))
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __contains__(self, date_str):
+        position = bisect_left(self._dates, date_str)
+        return position < len(self._dates) and self._dates[position] == date_str
+
+    def add(self, date_str: str):
+        if date_str not in self:
+            insort(self._dates, date_str)
+
+    def before(self, date_str: str):
+        """Latest date strictly before `date_str`, or None"""
+        position = bisect_left(self._dates, date_str)
+        return self._dates[position - 1] if position > 0 else None
+
+    def after(self, date_str: str):
+        """Earliest date strictly after `date_str`, or None"""
+        position = bisect_right(self._dates, date_str)
+        return self._dates[position] if position < len(self._dates) else None
+
+    def latest(self):
+        return self._dates[-1] if self._dates else None
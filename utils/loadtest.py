@@ -0,0 +1,161 @@
+"""Load test for the local HTTP API on a large synthetic database.
+
+Seeds a database with utils.benchmark, serves it with utils.api in this
+process (or targets a running server with --url), then runs client threads
+that each keep one connection open and issue a weighted mix of reads and
+writes for a fixed time. Reports requests per second and latency per route.
+
+Usage (from the repository root):
+    python -m utils.loadtest                                  # 100k rows, 8 clients, 10 s
+    python -m utils.loadtest --rows 1000000 --clients 16 --duration 30 --keep --data-dir /tmp/load
+    python -m utils.loadtest --url http://127.0.0.1:8080 --write-ratio 0
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlparse
+
+from utils.api import make_server
+from utils.benchmark import WORDS, seed_database
+from utils.readers import POOL_SIZE
+from utils.storage import LifeStore
+
+DEFAULT_ROWS = 100_000
+SEED_START = datetime(2015, 1, 1, 6, 0)  # first journal entry written by seed_database
+SEED_FIRST_WEEK = date(2000, 1, 3)  # first planning week written by seed_database
+
+
+def request_mix(rng, rows, write_ratio):
+    """Return a function producing one (route name, method, path, body) request at a time"""
+    last_day = (SEED_START + timedelta(hours=8 * max(rows - 1, 0))).date()
+    days = (last_day - SEED_START.date()).days + 1
+    weeks = max(rows // 7, 1)
+
+    def random_day():
+        return (SEED_START.date() + timedelta(days=rng.randrange(days))).isoformat()
+
+    reads = [
+        (30, lambda: ('GET /tasks', 'GET', '/tasks?status=pending&limit=100', None)),
+        (30, lambda: ('GET /journal', 'GET', f'/journal?date={random_day()}', None)),
+        (27, lambda: ('GET /weeks', 'GET', f'/weeks/{SEED_FIRST_WEEK + timedelta(weeks=rng.randrange(weeks))}', None)),
+        (10, lambda: ('GET /analytics', 'GET', '/analytics?start=2015-01-01&end=2015-12-31', None)),
+        # Seeded entries all share a small vocabulary, so every search ranks every entry
+        (3, lambda: ('GET /journal/search', 'GET', f'/journal/search?q={rng.choice(WORDS)}&limit=20', None)),
+    ]
+    writes = [
+        (60, lambda: ('POST /tasks', 'POST', '/tasks', {'description': ' '.join(rng.choices(WORDS, k=4))})),
+        (40, lambda: ('PUT /weeks', 'PUT', f'/weeks/{SEED_FIRST_WEEK + timedelta(weeks=rng.randrange(weeks))}',
+                      {'days': {str(rng.randrange(7)): ' '.join(rng.choices(WORDS, k=12))}})),
+    ]
+
+    def pick(choices):
+        return rng.choices([make for _, make in choices], weights=[weight for weight, _ in choices])[0]()
+
+    return lambda: pick(writes if rng.random() < write_ratio else reads)
+
+
+def run_client(url, rows, write_ratio, deadline, seed, results):
+    """Issue requests over one keep-alive connection until `deadline`; appends (route, ms, status)"""
+    rng = random.Random(seed)
+    next_request = request_mix(rng, rows, write_ratio)
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    timings = []
+    try:
+        while time.perf_counter() < deadline:
+            route, method, path, body = next_request()
+            payload = None if body is None else json.dumps(body)
+            started = time.perf_counter()
+            conn.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            timings.append((route, (time.perf_counter() - started) * 1000, response.status))
+    finally:
+        conn.close()
+        results.extend(timings)
+
+
+def run_load(url, rows, clients, duration, write_ratio):
+    """Run `clients` threads against `url` for `duration` seconds and return (route, ms, status) timings"""
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=run_client, args=(url, rows, write_ratio, deadline, seed, results))
+               for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def print_results(results, duration):
+    """Print throughput and latency per route, then the totals"""
+    routes = {}
+    for route, ms, status in results:
+        routes.setdefault(route, []).append((ms, status))
+    print(f"{'route':<22}{'requests':>10}{'req/s':>10}{'errors':>8}{'median ms':>12}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, timings in sorted(routes.items()) + [('total', [(ms, status) for _, ms, status in results])]:
+        latencies = sorted(ms for ms, _ in timings)
+        errors = sum(1 for _, status in timings if status >= 400)
+        print(f"{route:<22}{len(latencies):>10}{len(latencies) / duration:>10.1f}{errors:>8}"
+              f"{statistics.median(latencies):>12.2f}"
+              f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:>10.2f}"
+              f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Life360 HTTP API")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="rows seeded per table")
+    parser.add_argument('--clients', type=int, default=8, help="concurrent client connections")
+    parser.add_argument('--duration', type=float, default=10, help="seconds to run")
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="share of requests that write")
+    parser.add_argument('--pool-size', type=int, default=POOL_SIZE, help="read connections for the in-process server")
+    parser.add_argument('--url', help="load an already running server instead of starting one")
+    parser.add_argument('--data-dir', help="directory for the seeded database (default: a temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep and reuse the seeded database")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        results = run_load(args.url, args.rows, args.clients, args.duration, args.write_ratio)
+        print_results(results, args.duration)
+        return
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='life360-load-')
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'life_load_{args.rows}.db')
+    if not (args.keep and os.path.exists(path)):
+        if os.path.exists(path):
+            os.remove(path)
+        started = time.perf_counter()
+        seed_database(path, args.rows)
+        print(f"Seeded {args.rows} rows per table in {time.perf_counter() - started:.1f}s")
+
+    store = LifeStore(path, reader_pool_size=args.pool_size)
+    # Let the server's catch-up jobs finish first, so they aren't part of the measurement
+    for thread in store.start_background_catch_up():
+        thread.join()
+    server = make_server(store, port=0)
+    threading.Thread(target=server.serve_forever, name='api', daemon=True).start()
+    try:
+        results = run_load(f'http://127.0.0.1:{server.server_port}', args.rows, args.clients,
+                           args.duration, args.write_ratio)
+    finally:
+        server.shutdown()
+        server.server_close()
+        store.close()
+        if not args.keep:
+            os.remove(path)
+    print(f"{args.clients} clients, {args.duration:g}s, {args.write_ratio:.0%} writes, "
+          f"{args.pool_size} pooled readers, {args.rows} rows per table")
+    print_results(results, args.duration)
+
+
+if __name__ == "__main__":
+    main()
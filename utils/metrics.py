@@ -0,0 +1,244 @@
+"""Opt-in timing spans and histograms for SQL statements and UI refreshes.
+
+Set LIFE360_METRICS=1 to turn it on. Every SQL statement run through a store
+connection, and every app method wrapped with `timed`, then records its
+duration (and row count, for SQL) into an in-process histogram. Histograms are
+written to LIFE360_METRICS_FILE on exit or on demand: Prometheus text format
+when the file name ends in .prom, JSON otherwise.
+
+When the variable is unset, `timed` returns the function untouched and
+`instrument_connection` returns the connection untouched, so there is nothing
+left on the hot path.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+ENABLED = os.environ.get('LIFE360_METRICS', '') not in ('', '0')
+METRICS_FILE = os.environ.get('LIFE360_METRICS_FILE', 'life360_metrics.json')
+
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+RECENT_SPANS = 500  # spans kept for the debug overlay
+
+
+class Histogram:
+    """Count, sum, max and cumulative-ready bucket counts of durations in ms"""
+    __slots__ = ('count', 'total_ms', 'max_ms', 'rows', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)  # last bucket is +Inf
+
+    def observe(self, ms: float, rows: int):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+
+class Metrics:
+    """Histograms by span name plus a window of the most recent spans"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.recent = deque(maxlen=RECENT_SPANS)
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, ms: float, rows=0):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms, rows)
+            self.recent.append((name, ms, rows, time.time()))
+
+    def add_rows(self, name: str, rows: int):
+        """Count rows fetched after a span was recorded, without observing another span"""
+        if rows:
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is not None:
+                    histogram.rows += rows
+
+    def slowest_recent(self, limit=20):
+        """Return the slowest (name, ms, rows, timestamp) spans in the recent window"""
+        with self._lock:
+            return sorted(self.recent, key=lambda span: span[1], reverse=True)[:limit]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': h.count, 'total_ms': round(h.total_ms, 3), 'max_ms': round(h.max_ms, 3),
+                    'mean_ms': round(h.total_ms / h.count, 3), 'rows': h.rows,
+                    'buckets': dict(zip([str(b) for b in BUCKETS_MS] + ['+Inf'], h.buckets)),
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP life360_span_duration_ms Duration of instrumented operations",
+            "# TYPE life360_span_duration_ms histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip([str(b) for b in BUCKETS_MS] + ['+Inf'], h.buckets):
+                    cumulative += count
+                    lines.append(f'life360_span_duration_ms_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'life360_span_duration_ms_sum{{span="{label}"}} {h.total_ms:.3f}')
+                lines.append(f'life360_span_duration_ms_count{{span="{label}"}} {h.count}')
+                lines.append(f'life360_span_rows_total{{span="{label}"}} {h.rows}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path=None):
+        """Write the histograms to `path` (default LIFE360_METRICS_FILE) and return the path"""
+        path = path or METRICS_FILE
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name: str):
+    """Time a block; a no-op unless metrics are enabled"""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, (time.perf_counter() - started) * 1000)
+
+
+def timed(name: str):
+    """Decorator recording each call as a span; returns the function unchanged when disabled"""
+    def decorate(function):
+        if not ENABLED:
+            return function
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe(name, (time.perf_counter() - started) * 1000)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorate
+
+
+def statement_name(sql: str) -> str:
+    """Span name for a statement: 'sql ' plus its first 80 characters, whitespace collapsed"""
+    return 'sql ' + re.sub(r'\s+', ' ', sql).strip()[:80]
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that records a statement once its first rows are fetched.
+
+    Writes are recorded as soon as they execute, with their rowcount. Reads
+    are recorded at the end of the first fetch, so the span covers execution
+    through the first rows; rows from every later fetch or iteration are added
+    to the same histogram.
+    """
+
+    def __init__(self, cursor, name, started, is_read):
+        self._cursor = cursor
+        self._name = name
+        self._started = started
+        self._recorded = not is_read
+
+    def _record(self, rows):
+        if self._recorded:
+            metrics.add_rows(self._name, rows)
+        else:
+            self._recorded = True
+            metrics.observe(self._name, (time.perf_counter() - self._started) * 1000, rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._record(0 if row is None else 1)
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._record(len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        self._record(len(rows))
+        return rows
+
+    def __iter__(self):
+        first = next(self._cursor, None)
+        self._record(0 if first is None else 1)
+        if first is None:
+            return
+        yield first
+        rows = 0
+        try:
+            for row in self._cursor:
+                rows += 1
+                yield row
+        finally:
+            # Also on an abandoned loop, once the generator is closed
+            metrics.add_rows(self._name, rows)
+
+    def __getattr__(self, attribute):
+        return getattr(self._cursor, attribute)
+
+
+class InstrumentedConnection:
+    """sqlite3.Connection wrapper that times execute() and executemany()"""
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        changes = self._conn.total_changes
+        cursor = self._conn.execute(sql, params)
+        # Only statements that return rows have columns, whatever their first keyword (WITH ... INSERT has none)
+        is_read = cursor.description is not None
+        if not is_read:
+            # sqlite3 leaves rowcount at -1 unless the statement starts with INSERT/UPDATE/DELETE/REPLACE
+            rows = cursor.rowcount if cursor.rowcount >= 0 else self._conn.total_changes - changes
+            metrics.observe(statement_name(sql), (time.perf_counter() - started) * 1000, rows)
+        return InstrumentedCursor(cursor, statement_name(sql), started, is_read)
+
+    def executemany(self, sql, rows):
+        started = time.perf_counter()
+        cursor = self._conn.executemany(sql, rows)
+        metrics.observe(statement_name(sql), (time.perf_counter() - started) * 1000, max(cursor.rowcount, 0))
+        return cursor
+
+    def __getattr__(self, attribute):
+        return getattr(self._conn, attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._conn, attribute, value)
+
+
+def instrument_connection(conn):
+    """Wrap a connection so its statements are timed; returns it untouched when disabled"""
+    return InstrumentedConnection(conn) if ENABLED else conn
@@ -1,26 +1,499 @@
+"""Versioned schema migrations keyed on PRAGMA user_version.
+
+Each migration runs once, in order, and bumps user_version when it finishes,
+so a database that is already current skips all DDL at startup. Backfills run
+in bounded batches that commit as they go: if the app is interrupted part way
+through a large database, the next launch resumes with the rows still missing.
+"""
 from datetime import datetime
-import sqlite3
 
-def migrate_journal_entries_add_entry_datetime(self):
-    # 1. Add the column if it doesn't exist
+BATCH_SIZE = 5000
+
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    """Register a migration function for a schema version"""
+    def register(function):
+        MIGRATIONS.append((version, name, function))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return function
+    return register
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def print_progress(name: str, done: int, total: int):
+    """Progress callback that reports backfills on stdout"""
+    print(f"Migrating {name}: {done}/{total} rows")
+
+
+def table_columns(conn, table: str):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def migrate(conn, progress=None):
+    """Apply every pending migration and return the resulting schema version.
+
+    `progress` is called as progress(name, done, total) after each backfill batch.
+    """
+    version = get_version(conn)
+    if version >= latest_version():
+        return version
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # manage transactions explicitly
+    try:
+        for target, name, function in MIGRATIONS:
+            if target <= version:
+                continue
+            function(conn, lambda done, total: progress and progress(name, done, total))
+            conn.execute(f"PRAGMA user_version = {target}")
+            version = target
+    finally:
+        conn.isolation_level = isolation_level
+    return version
+
+
+def run_in_transaction(conn, *statements):
+    """Execute DDL/DML statements atomically"""
+    conn.execute("BEGIN")
     try:
-        self.cursor.execute("ALTER TABLE journal_entries ADD COLUMN entry_datetime DATETIME")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    # 2. Backfill the column for existing rows
-    self.cursor.execute("SELECT rowid, entry_date, entry_time FROM journal_entries WHERE entry_datetime IS NULL OR entry_datetime = ''")
-    rows = self.cursor.fetchall()
-    for rowid, entry_date, entry_time in rows:
-        try:
-            # Parse and format as ISO datetime
-            dt = datetime.strptime(f"{entry_date} {entry_time}", "%Y-%m-%d %I:%M%p")
-            dt_str = dt.isoformat(sep=' ')
-        except Exception:
-            dt_str = None
-        if dt_str:
-            self.cursor.execute(
-                "UPDATE journal_entries SET entry_datetime = ? WHERE rowid = ?",
-                (dt_str, rowid)
-            )
-    self.conn.commit()
\ No newline at end of file
+        for statement in statements:
+            conn.execute(statement)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def backfill_in_batches(conn, count_sql: str, batch_sql: str, report, batch_size=BATCH_SIZE):
+    """Run a self-limiting UPDATE in committed batches until it touches no rows.
+
+    `batch_sql` must only match rows that still need the backfill and take the
+    batch size as its single parameter, which is what makes the loop resumable.
+    """
+    total = conn.execute(count_sql).fetchone()[0]
+    done = 0
+    while done < total:
+        conn.execute("BEGIN")
+        updated = conn.execute(batch_sql, (batch_size,)).rowcount
+        conn.execute("COMMIT")
+        if updated <= 0:
+            break
+        done += updated
+        report(done, total)
+
+
+@migration(1, "base schema")
+def create_base_schema(conn, report):
+    run_in_transaction(
+        conn,
+        '''
+        CREATE TABLE IF NOT EXISTS priorities (
+            category TEXT PRIMARY KEY,
+            description TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS affirmations (
+            id INTEGER PRIMARY KEY,
+            content TEXT,
+            date_updated TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS vision_images (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            image_data TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            description TEXT,
+            category TEXT,
+            priority INTEGER,
+            status TEXT,
+            is_daily BOOLEAN,
+            created_at TEXT,
+            completed_at TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS journal_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_datetime DATETIME,
+            content TEXT,
+            feedback TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS weekly_planning (
+            week_start TEXT,
+            day_index INTEGER,
+            content TEXT,
+            PRIMARY KEY (week_start, day_index)
+        )
+        ''',
+    )
+
+
+@migration(2, "weekly_planning.weekly_intentions")
+def add_weekly_intentions(conn, report):
+    # Databases created by the old tab code are missing this column
+    if 'weekly_intentions' not in table_columns(conn, 'weekly_planning'):
+        run_in_transaction(conn, "ALTER TABLE weekly_planning ADD COLUMN weekly_intentions TEXT")
+
+
+@migration(3, "journal_entries.entry_datetime")
+def add_journal_entry_datetime(conn, report, batch_size=BATCH_SIZE):
+    columns = table_columns(conn, 'journal_entries')
+    if 'entry_datetime' not in columns:
+        run_in_transaction(conn, "ALTER TABLE journal_entries ADD COLUMN entry_datetime DATETIME")
+    if 'entry_time' not in columns:
+        return  # Only the legacy (entry_date, entry_time) schema needs a backfill
+
+    # The 12-hour "09:30AM" times can't be parsed in SQL, so parse in Python and
+    # write each batch with one executemany. Walking rowids keeps every batch an
+    # index seek and lets an interrupted run pick up where the NULLs start.
+    pending = "entry_datetime IS NULL OR entry_datetime = ''"
+    total = conn.execute(f"SELECT COUNT(*) FROM journal_entries WHERE {pending}").fetchone()[0]
+    done = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT rowid, entry_date, entry_time FROM journal_entries "
+            f"WHERE rowid > ? AND ({pending}) ORDER BY rowid LIMIT ?",
+            (last_rowid, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for rowid, entry_date, entry_time in rows:
+            try:
+                dt = datetime.strptime(f"{entry_date} {entry_time}", "%Y-%m-%d %I:%M%p")
+            except (TypeError, ValueError):
+                continue
+            updates.append((dt.isoformat(sep=' '), rowid))
+        conn.execute("BEGIN")
+        conn.executemany("UPDATE journal_entries SET entry_datetime = ? WHERE rowid = ?", updates)
+        conn.execute("COMMIT")
+        last_rowid = rows[-1][0]
+        done += len(rows)
+        report(done, total)
+
+
+@migration(4, "journal_entries.entry_date")
+def add_journal_entry_date(conn, report, batch_size=BATCH_SIZE):
+    # Legacy databases already have entry_date; it gets the same backfill and index
+    statements = []
+    if 'entry_date' not in table_columns(conn, 'journal_entries'):
+        statements.append("ALTER TABLE journal_entries ADD COLUMN entry_date TEXT")
+    # Index day lookups, with entry_datetime so per-day ordering needs no sort.
+    # Creating it first also turns every backfill batch below into an index seek.
+    statements.append(
+        "CREATE INDEX IF NOT EXISTS idx_journal_entries_entry_date "
+        "ON journal_entries (entry_date, entry_datetime)"
+    )
+    run_in_transaction(conn, *statements)
+
+    pending = "entry_date IS NULL AND entry_datetime IS NOT NULL"
+    backfill_in_batches(
+        conn,
+        f"SELECT COUNT(*) FROM journal_entries WHERE {pending}",
+        f"UPDATE journal_entries SET entry_date = date(entry_datetime) WHERE rowid IN "
+        f"(SELECT rowid FROM journal_entries WHERE {pending} LIMIT ?)",
+        report,
+        batch_size,
+    )
+
+
+@migration(5, "weekly_intentions table")
+def move_weekly_intentions(conn, report, batch_size=BATCH_SIZE):
+    # Intentions were copied into all seven weekly_planning rows; keep one per week
+    run_in_transaction(
+        conn,
+        '''
+        CREATE TABLE IF NOT EXISTS weekly_intentions (
+            week_start TEXT PRIMARY KEY,
+            intentions TEXT
+        )
+        ''',
+        '''
+        INSERT OR IGNORE INTO weekly_intentions (week_start, intentions)
+        SELECT week_start, MAX(weekly_intentions) FROM weekly_planning
+        WHERE weekly_intentions IS NOT NULL AND weekly_intentions != ''
+        GROUP BY week_start
+        ''',
+    )
+    # Clear the old copies so they stop taking up space
+    pending = "weekly_intentions IS NOT NULL"
+    backfill_in_batches(
+        conn,
+        f"SELECT COUNT(*) FROM weekly_planning WHERE {pending}",
+        f"UPDATE weekly_planning SET weekly_intentions = NULL WHERE rowid IN "
+        f"(SELECT rowid FROM weekly_planning WHERE {pending} LIMIT ?)",
+        report,
+        batch_size,
+    )
+
+
+@migration(6, "tasks list indexes")
+def add_task_list_indexes(conn, report):
+    # Keyset pagination: one index per status filter, plus one for "all"
+    run_in_transaction(
+        conn,
+        "CREATE INDEX IF NOT EXISTS idx_tasks_daily_status_created ON tasks (is_daily, status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_daily_created ON tasks (is_daily, created_at, id)",
+    )
+
+
+def fts5_available(conn):
+    return conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0] == 1
+
+
+@migration(7, "journal full-text search")
+def add_journal_search(conn, report):
+    statements = [
+        '''
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''',
+    ]
+    if fts5_available(conn):
+        statements += [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS journal_fts USING fts5(content, feedback, tokenize='unicode61', prefix='2 3')",
+            '''
+            CREATE TRIGGER IF NOT EXISTS journal_fts_insert AFTER INSERT ON journal_entries BEGIN
+                INSERT INTO journal_fts (rowid, content, feedback) VALUES (new.id, new.content, new.feedback);
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS journal_fts_delete AFTER DELETE ON journal_entries BEGIN
+                DELETE FROM journal_fts WHERE rowid = old.id;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS journal_fts_update AFTER UPDATE OF content, feedback ON journal_entries BEGIN
+                DELETE FROM journal_fts WHERE rowid = old.id;
+                INSERT INTO journal_fts (rowid, content, feedback) VALUES (new.id, new.content, new.feedback);
+            END
+            ''',
+            # Rows up to here predate the triggers; the app indexes them in the background
+            '''
+            INSERT OR IGNORE INTO app_meta (key, value)
+            SELECT 'journal_fts_backfill_upto', COALESCE(MAX(id), 0) FROM journal_entries
+            ''',
+            "INSERT OR IGNORE INTO app_meta (key, value) VALUES ('journal_fts_backfilled', '0')",
+        ]
+    run_in_transaction(conn, *statements)
+
+
+@migration(8, "feedback cache")
+def add_feedback_cache(conn, report):
+    run_in_transaction(
+        conn,
+        '''
+        CREATE TABLE IF NOT EXISTS feedback_cache (
+            key TEXT PRIMARY KEY,
+            feedback TEXT,
+            size INTEGER,
+            last_used REAL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_feedback_cache_last_used ON feedback_cache (last_used)",
+    )
+
+
+@migration(9, "journal sentiment scores")
+def add_journal_sentiment(conn, report):
+    run_in_transaction(
+        conn,
+        '''
+        CREATE TABLE IF NOT EXISTS journal_sentiment (
+            entry_id INTEGER PRIMARY KEY,
+            positive INTEGER,
+            challenge INTEGER,
+            score INTEGER,
+            matcher_version TEXT
+        )
+        ''',
+        # Scores follow their entry: deleted with it, and dropped for rescoring when it is edited
+        '''
+        CREATE TRIGGER IF NOT EXISTS journal_sentiment_delete AFTER DELETE ON journal_entries BEGIN
+            DELETE FROM journal_sentiment WHERE entry_id = old.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS journal_sentiment_update AFTER UPDATE OF content ON journal_entries BEGIN
+            DELETE FROM journal_sentiment WHERE entry_id = old.id;
+        END
+        ''',
+    )
+
+
+@migration(10, "tasks archive")
+def add_tasks_archive(conn, report):
+    run_in_transaction(
+        conn,
+        '''
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id TEXT PRIMARY KEY,
+            description TEXT,
+            category TEXT,
+            priority INTEGER,
+            status TEXT,
+            is_daily BOOLEAN,
+            created_at TEXT,
+            completed_at TEXT,
+            archived_at TEXT
+        )
+        ''',
+        # The archive browser pages newest-completed first
+        "CREATE INDEX IF NOT EXISTS idx_tasks_archive_completed ON tasks_archive (completed_at, id)",
+        # The rollover finds tasks completed before a cutoff
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_completed ON tasks (status, completed_at)",
+    )
+
+
+def rollup_delta_sql(row: str, sign: int):
+    """Statements adding (sign=1) or removing (sign=-1) one task row's share of the daily rollups"""
+    category = f"COALESCE({row}.category, 'general')"
+    return [
+        f'''
+        INSERT INTO task_daily_rollup (day, category, created, completed, lead_seconds)
+        SELECT date({row}.created_at), {category}, {sign}, 0, 0
+        WHERE {row}.created_at IS NOT NULL
+        ON CONFLICT (day, category) DO UPDATE SET created = created + excluded.created;
+        ''',
+        f'''
+        INSERT INTO task_daily_rollup (day, category, created, completed, lead_seconds)
+        SELECT date({row}.completed_at), {category}, 0, {sign},
+               {sign} * (julianday({row}.completed_at) - julianday({row}.created_at)) * 86400
+        WHERE {row}.status = 'completed' AND {row}.completed_at IS NOT NULL
+        ON CONFLICT (day, category) DO UPDATE SET completed = completed + excluded.completed,
+                                                  lead_seconds = lead_seconds + excluded.lead_seconds;
+        ''',
+    ]
+
+
+@migration(11, "task daily rollups")
+def add_task_rollups(conn, report):
+    # Rollups cover tasks and tasks_archive together, so archiving a task
+    # (delete from one, insert into the other) leaves them unchanged
+    statements = [
+        '''
+        CREATE TABLE IF NOT EXISTS task_daily_rollup (
+            day TEXT,
+            category TEXT,
+            created INTEGER,
+            completed INTEGER,
+            lead_seconds REAL,
+            PRIMARY KEY (day, category)
+        ) WITHOUT ROWID
+        ''',
+    ]
+    for table in ('tasks', 'tasks_archive'):
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rollup_insert AFTER INSERT ON {table} BEGIN "
+            + ''.join(rollup_delta_sql('new', 1)) + " END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rollup_delete AFTER DELETE ON {table} BEGIN "
+            + ''.join(rollup_delta_sql('old', -1)) + " END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rollup_update AFTER UPDATE OF status, completed_at, created_at, category "
+            f"ON {table} BEGIN " + ''.join(rollup_delta_sql('old', -1) + rollup_delta_sql('new', 1)) + " END",
+        ]
+    # Existing rows are rolled up by the app in the background (LifeStore.rebuild_task_rollups)
+    statements.append("INSERT OR REPLACE INTO app_meta (key, value) VALUES ('task_rollups_built', '0')")
+    run_in_transaction(conn, *statements)
+
+
+# Synced tables and the columns that identify a row on every device. Journal
+# ids are local AUTOINCREMENT values, so entries are matched on a random uid.
+SYNC_KEYS = {
+    'priorities': ['category'],
+    'affirmations': ['id'],
+    'tasks': ['id'],
+    'tasks_archive': ['id'],
+    'journal_entries': ['uid'],
+    'weekly_planning': ['week_start', 'day_index'],
+    'weekly_intentions': ['week_start'],
+}
+SYNC_EPOCH = '1970-01-01T00:00:00.000Z'  # modified_at of rows that predate change tracking
+
+
+def sync_log_sql(table: str, row: str, deleted: int):
+    """Statement moving one row's change-log entry to the end of the log"""
+    key = f"json_array({', '.join(f'{row}.{column}' for column in SYNC_KEYS[table])})"
+    # Delete then insert rather than INSERT OR REPLACE, which an outer
+    # INSERT OR IGNORE would silently turn into IGNORE
+    return (
+        f"DELETE FROM sync_log WHERE tbl = '{table}' AND row_key = {key}; "
+        f"INSERT INTO sync_log (tbl, row_key, deleted, modified_at, origin) "
+        f"VALUES ('{table}', {key}, {deleted}, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), NULL);"
+    )
+
+
+@migration(12, "sync change log")
+def add_sync_log(conn, report, batch_size=BATCH_SIZE):
+    if 'uid' not in table_columns(conn, 'journal_entries'):
+        run_in_transaction(conn, "ALTER TABLE journal_entries ADD COLUMN uid TEXT")
+    pending = "uid IS NULL"
+    backfill_in_batches(
+        conn,
+        f"SELECT COUNT(*) FROM journal_entries WHERE {pending}",
+        f"UPDATE journal_entries SET uid = lower(hex(randomblob(16))) WHERE rowid IN "
+        f"(SELECT rowid FROM journal_entries WHERE {pending} LIMIT ?)",
+        report,
+        batch_size,
+    )
+
+    statements = [
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_journal_entries_uid ON journal_entries (uid)",
+        # Entries inserted without a uid (imports, older code) get one
+        '''
+        CREATE TRIGGER IF NOT EXISTS journal_entries_uid AFTER INSERT ON journal_entries WHEN new.uid IS NULL BEGIN
+            UPDATE journal_entries SET uid = lower(hex(randomblob(16))) WHERE id = new.id;
+        END
+        ''',
+        # One entry per row ever seen, moved to a new seq on every change; a
+        # NULL origin marks a change made on this device that is not pushed yet
+        '''
+        CREATE TABLE IF NOT EXISTS sync_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            deleted INTEGER NOT NULL,
+            modified_at TEXT NOT NULL,
+            origin TEXT
+        )
+        ''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_log_row ON sync_log (tbl, row_key)",
+        "CREATE INDEX IF NOT EXISTS idx_sync_log_local ON sync_log (seq) WHERE origin IS NULL",
+        "INSERT OR IGNORE INTO app_meta (key, value) VALUES ('sync_device_id', lower(hex(randomblob(8))))",
+    ]
+    for table, keys in SYNC_KEYS.items():
+        # Journal rows are only logged once they have a uid
+        has_key = lambda row: ' AND '.join(f'{row}.{column} IS NOT NULL' for column in keys)
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON {table} "
+            f"WHEN {has_key('new')} BEGIN {sync_log_sql(table, 'new', 0)} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE ON {table} "
+            f"WHEN {has_key('new')} BEGIN {sync_log_sql(table, 'new', 0)} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table} "
+            f"WHEN {has_key('old')} BEGIN {sync_log_sql(table, 'old', 1)} END",
+            # Existing rows are logged as unpushed changes older than any real edit
+            f"INSERT OR IGNORE INTO sync_log (tbl, row_key, deleted, modified_at, origin) "
+            f"SELECT '{table}', json_array({', '.join(keys)}), 0, '{SYNC_EPOCH}', NULL FROM {table} "
+            f"WHERE {' AND '.join(f'{column} IS NOT NULL' for column in keys)}",
+        ]
+    run_in_transaction(conn, *statements)
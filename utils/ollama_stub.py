@@ -0,0 +1,70 @@
+"""Local stand-in for an Ollama server, for exercising the streaming feedback path.
+
+Answers POST /api/generate with canned feedback streamed one word at a time
+in Ollama's NDJSON format.
+
+Usage (from the repository root):
+    python -m utils.ollama_stub --port 11434 --delay 0.05
+    LIFE360_FEEDBACK_BACKEND=ollama python index.py
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_FEEDBACK = (
+    "**Reflection Analysis:**\n\nThanks for writing today. You named what went well and what "
+    "felt heavy, which is the first step to acting on both.\n\n**Suggestions:**\n"
+    "• Pick one priority to move forward tomorrow\n• Note one small win before bed"
+)
+
+
+def make_handler(delay: float, text: str):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/api/generate':
+                self.send_error(404)
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            words = text.split(' ')
+            try:
+                for i, word in enumerate(words):
+                    token = word if i == len(words) - 1 else word + ' '
+                    line = {'model': request.get('model'), 'response': token, 'done': False}
+                    self.wfile.write(json.dumps(line).encode() + b'\n')
+                    self.wfile.flush()
+                    time.sleep(delay)
+                self.wfile.write(json.dumps({'model': request.get('model'), 'response': '', 'done': True}).encode() + b'\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client cancelled or timed out
+
+        def log_message(self, format, *args):
+            pass
+    return StubHandler
+
+
+def serve(port=11434, delay=0.05, text=CANNED_FEEDBACK):
+    """Create (but don't start) a stub server bound to localhost"""
+    return ThreadingHTTPServer(('127.0.0.1', port), make_handler(delay, text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub Ollama server for local testing")
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--delay', type=float, default=0.05, help="seconds between streamed tokens")
+    args = parser.parse_args(argv)
+    server = serve(args.port, args.delay)
+    print(f"Stub Ollama listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Read-only SQLite connections, opened one per thread or borrowed from a pool.
+
+WAL mode lets any number of readers run alongside the single writer without
+blocking it or each other. Long-lived app threads keep a connection of their
+own; servers handle each request on a short-lived thread, so they borrow one
+from a ReaderPool instead, which caps how many are open at once and keeps
+their page caches warm between requests.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.metrics import instrument_connection
+from utils.writer import configure_connection
+
+POOL_SIZE = 8
+
+
+def open_reader(db_path: str):
+    """Open a configured read-only connection usable from any thread"""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+    return instrument_connection(configure_connection(conn))
+
+
+class ReaderPool:
+    """At most `size` read-only connections, opened on demand and reused"""
+
+    def __init__(self, db_path: str, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()  # most recently used first, its cache is warmest
+        self._slots = threading.BoundedSemaphore(size)
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting while all `size` are in use"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No read connection free after {timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            conn = open_reader(self.db_path)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._opened.append(conn)
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")  # never hand a stale snapshot to the next borrower
+        self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
@@ -0,0 +1,93 @@
+"""Keyword sentiment for journal entries.
+
+KeywordMatcher compiles every keyword category into one regular expression,
+so a reflection is scanned once no matter how many keywords there are, and
+only whole words count ("unaccomplished" is not "accomplished").
+
+Scoring the whole journal (run from the repository root):
+    python -m utils.sentiment [path/to/life_management.db]
+"""
+import argparse
+import re
+
+POSITIVE_KEYWORDS = ['grateful', 'accomplished', 'progress', 'success', 'happy', 'achieved', 'proud']
+CHALLENGE_KEYWORDS = ['difficult', 'struggle', 'failed', 'worried', 'stressed', 'behind', 'overwhelmed']
+
+MATCHER_VERSION = '1'  # bump when keywords or matching rules change, to rescore history
+SCORE_BATCH_SIZE = 1000
+
+
+class KeywordMatcher:
+    """Counts whole-word keyword hits per category in a single pass"""
+
+    # Plain inflections still count: "struggles", "progressed", "worrying"
+    SUFFIXES = r'(?:s|es|ed|ing)?'
+
+    def __init__(self, categories: dict):
+        groups = []
+        for name, words in categories.items():
+            # Longest first so a keyword never shadows a longer one sharing its prefix
+            alternatives = '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+            groups.append(f'(?P<{name}>{alternatives})')
+        self.categories = list(categories)
+        self.pattern = re.compile(rf"\b(?:{'|'.join(groups)}){self.SUFFIXES}\b", re.IGNORECASE)
+
+    def count(self, text: str) -> dict:
+        """Return {category: number of keyword hits} for a text"""
+        counts = dict.fromkeys(self.categories, 0)
+        for match in self.pattern.finditer(text):
+            counts[match.lastgroup] += 1
+        return counts
+
+
+default_matcher = KeywordMatcher({'positive': POSITIVE_KEYWORDS, 'challenge': CHALLENGE_KEYWORDS})
+
+
+def score_text(text: str, matcher=default_matcher):
+    """Return (positive, challenge, score) for a text"""
+    counts = matcher.count(text or '')
+    return counts['positive'], counts['challenge'], counts['positive'] - counts['challenge']
+
+
+def score_journal_history(store, batch_size=SCORE_BATCH_SIZE, progress=None):
+    """Score every entry that has no score from the current matcher, in one streaming pass.
+
+    Entries are read in id order a batch at a time and each batch of scores is
+    written with one executemany, so memory stays flat on any journal size.
+    Returns the number of entries scored.
+    """
+    scored = 0
+    after = 0
+    while True:
+        rows = store.get_unscored_journal_entries(after, MATCHER_VERSION, batch_size)
+        if not rows:
+            return scored
+        try:
+            store.save_journal_sentiments(
+                [(entry_id, *score_text(content), MATCHER_VERSION) for entry_id, content in rows]
+            ).result()
+        except RuntimeError:
+            return scored  # store closed during shutdown
+        after = rows[-1][0]
+        scored += len(rows)
+        if progress:
+            progress('journal_sentiment', scored, None)
+
+
+def main(argv=None):
+    from utils.storage import LifeStore
+
+    parser = argparse.ArgumentParser(description="Score journal entries for mood trends")
+    parser.add_argument('db_path', nargs='?', default='life_management.db')
+    args = parser.parse_args(argv)
+    store = LifeStore(args.db_path)
+    try:
+        print(f"Scored {score_journal_history(store)} entries")
+        for month, entries, positive, challenge, average in store.get_mood_trend():
+            print(f"{month}  entries={entries:<4} positive={positive:<4} challenge={challenge:<4} avg={average:+.2f}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
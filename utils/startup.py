@@ -0,0 +1,40 @@
+"""Cold-start timing, broken down by phase.
+
+The app marks the end of each startup phase (imports, window, database, first
+tab, ...) and, once the first frame has been drawn, prints how long each took
+against the time-to-first-paint budget. Set LIFE360_STARTUP_REPORT=1 to see it.
+"""
+import os
+import time
+
+FIRST_PAINT_BUDGET_MS = 500
+
+
+class StartupTimer:
+    """Records how long each startup phase took, in order"""
+
+    def __init__(self, started=None, budget_ms=FIRST_PAINT_BUDGET_MS):
+        self.started = started if started is not None else time.perf_counter()
+        self.budget_ms = budget_ms
+        self.phases = []
+        self._last = self.started
+
+    def mark(self, phase: str):
+        """End the current phase and start the next one"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def report(self) -> str:
+        total = sum(ms for _, ms in self.phases)
+        lines = [f"{phase:<20} {ms:8.1f} ms" for phase, ms in self.phases]
+        verdict = "within" if total <= self.budget_ms else "OVER"
+        lines.append(f"{'first paint':<20} {total:8.1f} ms ({verdict} the {self.budget_ms} ms budget)")
+        return '\n'.join(lines)
+
+
+def report_enabled():
+    return os.environ.get('LIFE360_STARTUP_REPORT', '') not in ('', '0')
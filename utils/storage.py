@@ -0,0 +1,811 @@
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from utils.journal import JournalDateIndex
+from utils.migrations import migrate
+from utils.readers import POOL_SIZE, ReaderPool, open_reader
+from utils.tasks import Task
+from utils.writer import DatabaseWriter
+
+PRIORITY_CATEGORIES = ['career', 'health', 'finances', 'religion', 'relationships', 'hobbies']
+
+SEARCH_BATCH_SIZE = 500
+WEEK_CACHE_SIZE = 16  # weeks of planning kept in memory
+ARCHIVE_AFTER_DAYS = 7  # completed tasks move to tasks_archive this long after completion
+ARCHIVE_BATCH_SIZE = 500
+TASK_COLUMNS = "id, description, category, priority, status, is_daily, created_at, completed_at"
+# Snippet highlight markers; control characters never appear in typed text
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+class LifeStore:
+    """SQLite storage for priorities, affirmations, tasks, journal and weekly planning.
+
+    Knows nothing about Tk: every method takes and returns plain Python values so
+    the same code paths can be driven by the app, scripts and benchmarks.
+
+    Writes go through a background DatabaseWriter and return a Future; callers
+    that need to read their own write back wait on it. Reads use a read-only
+    connection per thread, which WAL mode lets run alongside the writer;
+    inside `reading()` they use one borrowed from a shared pool instead.
+    """
+
+    def __init__(self, db_path='life_management.db', migration_progress=None, reader_pool_size=POOL_SIZE):
+        self.db_path = db_path
+        self.migration_progress = migration_progress
+        self.writer = DatabaseWriter(db_path)
+        self.reader_pool = ReaderPool(db_path, reader_pool_size)
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._pending_weeks = {}
+        self._weeks = OrderedDict()  # LRU of week_start -> ({day_index: content}, intentions)
+        self._week_saves = {}  # week_start -> saves queued so far, to spot prefetches that raced a save
+        self._weeks_lock = threading.Lock()
+        self._prefetcher = None
+        self._priorities = None  # snapshot of the priorities table, loaded on first use
+        self._journal_dates = None  # JournalDateIndex, loaded on first use
+        self._journal_dates_lock = threading.Lock()
+        self._closing = threading.Event()
+        self.init_schema()
+
+    def init_schema(self):
+        """Bring the schema up to date; a no-op when it is already current"""
+        self.writer.submit(lambda conn: migrate(conn, self.migration_progress), exclusive=True).result()
+
+    @property
+    def reader(self):
+        """Read-only connection for the calling thread"""
+        borrowed = getattr(self._local, 'borrowed', None)
+        if borrowed is not None:
+            return borrowed
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = open_reader(self.db_path)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def reading(self, timeout=None):
+        """Serve the calling thread's reads from a pooled connection until the block exits.
+
+        For short-lived threads, such as one per HTTP request, which would
+        otherwise each open and keep a connection of their own.
+        """
+        if getattr(self._local, 'borrowed', None) is not None:
+            yield self._local.borrowed  # nested; keep the outer connection
+            return
+        with self.reader_pool.connection(timeout) as conn:
+            self._local.borrowed = conn
+            try:
+                yield conn
+            finally:
+                self._local.borrowed = None
+
+    def flush(self):
+        """Block until every queued write is committed"""
+        self.writer.flush()
+
+    def commit_durably(self):
+        """Queue a commit synced to disk, which makes every commit queued before it durable too.
+
+        The writer runs with synchronous=NORMAL, so its commits survive the app
+        crashing but not the OS until the WAL is next synced. Returns a Future.
+        """
+        def work(conn):
+            conn.execute("PRAGMA synchronous = FULL")
+            try:
+                conn.execute("BEGIN")
+                try:
+                    # Only a commit that writes a frame syncs the WAL
+                    conn.execute("INSERT OR REPLACE INTO app_meta (key, value) VALUES ('last_durable_commit', ?)",
+                                 (datetime.now().isoformat(),))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.execute("PRAGMA synchronous = NORMAL")
+        return self.writer.submit(work, exclusive=True)
+
+    def close(self):
+        """Commit queued writes and close all connections"""
+        self._closing.set()
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(wait=True, cancel_futures=True)
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self.reader_pool.close()
+        # Last, so the final connection to close can write: it checkpoints and removes -wal/-shm
+        self.writer.close()
+
+    # Priorities and affirmations
+
+    def get_priorities(self):
+        """Return a {category: description} dict of saved priorities"""
+        if self._priorities is None:
+            rows = self.reader.execute("SELECT category, description FROM priorities").fetchall()
+            self._priorities = {category: description or "" for category, description in rows}
+        return dict(self._priorities)
+
+    def get_goal_priorities(self):
+        """Return (category, description) pairs for priorities that have a description"""
+        return [(category, description) for category, description in self.get_priorities().items() if description]
+
+    def invalidate_priorities(self):
+        """Drop the priorities snapshot after the table changed behind the store's back"""
+        self._priorities = None
+
+    def save_priority(self, category: str, description: str):
+        """Queue a save of one priority"""
+        # Keep the in-memory snapshot current so readers never re-query it
+        self.get_priorities()
+        self._priorities[category] = description
+        return self.writer.execute(
+            "INSERT OR REPLACE INTO priorities (category, description) VALUES (?, ?)",
+            (category, description),
+            key=('priorities', category)
+        )
+
+    def save_priorities(self, priorities: dict):
+        """Queue saves of a {category: description} dict of priorities"""
+        futures = [self.save_priority(category, description) for category, description in priorities.items()]
+        return futures[-1] if futures else None
+
+    def get_affirmations(self):
+        """Return the latest affirmations text, or None if nothing was saved"""
+        result = self.reader.execute(
+            "SELECT content FROM affirmations ORDER BY date_updated DESC LIMIT 1"
+        ).fetchone()
+        return result[0] if result else None
+
+    def save_affirmations(self, content: str):
+        """Queue a save of the affirmations text"""
+        return self.writer.execute(
+            "INSERT OR REPLACE INTO affirmations (id, content, date_updated) VALUES (1, ?, ?)",
+            (content, datetime.now().isoformat()),
+            key='affirmations'
+        )
+
+    # Tasks
+
+    def add_task(self, description: str, is_daily: bool, category='general', priority=1):
+        """Queue a new pending task; the Future resolves to the inserted Task"""
+        task = Task(str(uuid.uuid4()), description, 'pending', datetime.now().isoformat(), priority=priority)
+
+        def insert(conn):
+            conn.execute(
+                """INSERT INTO tasks
+                   (id, description, category, priority, status, is_daily, created_at, completed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (task.id, task.description, category, priority, task.status, is_daily,
+                 task.created_at, task.completed_at)
+            )
+            return task
+        return self.writer.submit(insert)
+
+    def list_tasks(self, is_daily: bool):
+        """Return daily or backlog Tasks, oldest first"""
+        rows = self.reader.execute(
+            "SELECT id, description, status, created_at, completed_at, priority FROM tasks WHERE is_daily = ? ORDER BY created_at, id",
+            (is_daily,)
+        ).fetchall()
+        return [Task(*row) for row in rows]
+
+    def list_tasks_page(self, is_daily: bool, status=None, after=None, limit=100):
+        """Return up to `limit` Tasks ordered by (created_at, id), starting after the `after` key.
+
+        Keyset pagination: each page is an index seek past the last row of the
+        previous one, so deep pages cost the same as the first. `status` of
+        None returns every status.
+        """
+        where = ["is_daily = ?"]
+        params = [is_daily]
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if after is not None:
+            where.append("(created_at, id) > (?, ?)")
+            params.extend(after)
+        params.append(limit)
+        rows = self.reader.execute(
+            f"SELECT id, description, status, created_at, completed_at, priority FROM tasks "
+            f"WHERE {' AND '.join(where)} ORDER BY created_at, id LIMIT ?",
+            params
+        ).fetchall()
+        return [Task(*row) for row in rows]
+
+    def get_task(self, task_id: str):
+        """Return the Task with an id, or None"""
+        row = self.reader.execute(
+            "SELECT id, description, status, created_at, completed_at, priority FROM tasks WHERE id = ?",
+            (task_id,)
+        ).fetchone()
+        return Task(*row) if row else None
+
+    def set_task_status(self, task: Task, status: str):
+        """Queue a status change; the Future resolves to the updated Task"""
+        completed_at = datetime.now().isoformat() if status == 'completed' else None
+        updated = task._replace(status=status, completed_at=completed_at)
+
+        def update(conn):
+            conn.execute(
+                "UPDATE tasks SET status = ?, completed_at = ? WHERE id = ?",
+                (status, completed_at, task.id)
+            )
+            return updated
+        return self.writer.submit(update)
+
+    def set_tasks_status(self, tasks, status: str):
+        """Queue a status change for many tasks as one executemany; resolves to the Tasks that changed.
+
+        Tasks already in `status` are left alone, so completing a mixed
+        selection keeps the original completed_at of those already done.
+        """
+        completed_at = datetime.now().isoformat() if status == 'completed' else None
+        updated = [task._replace(status=status, completed_at=completed_at) for task in tasks if task.status != status]
+
+        def update(conn):
+            conn.executemany(
+                "UPDATE tasks SET status = ?, completed_at = ? WHERE id = ? AND status != ?",
+                [(status, completed_at, task.id, status) for task in updated]
+            )
+            return updated
+        return self.writer.submit(update)
+
+    def set_tasks_priority(self, tasks, priority: int):
+        """Queue a priority change for many tasks as one executemany; resolves to the updated Tasks"""
+        updated = [task._replace(priority=priority) for task in tasks]
+
+        def update(conn):
+            conn.executemany("UPDATE tasks SET priority = ? WHERE id = ?", [(priority, task.id) for task in updated])
+            return updated
+        return self.writer.submit(update)
+
+    def delete_tasks(self, task_ids):
+        """Queue deleting many tasks as one executemany"""
+        return self.writer.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def move_tasks_to_daily(self, task_ids):
+        """Queue moving many backlog tasks to today's tasks as one executemany"""
+        return self.writer.executemany(
+            "UPDATE tasks SET is_daily = ? WHERE id = ?",
+            [(True, task_id) for task_id in task_ids]
+        )
+
+    def rollover_tasks(self, today=None, archive_after_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+        """Start a new day's task lists, once per day.
+
+        Yesterday's daily tasks go back to the backlog, and tasks completed more
+        than `archive_after_days` ago move to tasks_archive in committed batches.
+        Returns (returned to backlog, archived), or None if today already ran.
+        Blocks until done; see rollover_tasks_in_background.
+        """
+        today = (today or date.today()).isoformat()
+
+        def claim_day(conn):
+            # Claiming the day and returning the tasks commit together, and the claim is one
+            # conditional write, so the app, the API and the CLI can't both run the same day
+            claimed = conn.execute(
+                "INSERT INTO app_meta (key, value) VALUES ('tasks_rollover_date', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value WHERE value < excluded.value",
+                (today,)
+            ).rowcount
+            if not claimed:
+                return None
+            return conn.execute(
+                "UPDATE tasks SET is_daily = ? WHERE is_daily = ? AND created_at < ? "
+                "AND (status = 'pending' OR completed_at < ?)",
+                (False, True, today, today)
+            ).rowcount
+
+        returned = self.writer.submit(claim_day).result()
+        if returned is None:
+            return None
+
+        cutoff = (date.fromisoformat(today) - timedelta(days=archive_after_days)).isoformat()
+        archived_at = datetime.now().isoformat()
+
+        def archive_batch(conn):
+            ids = conn.execute(
+                "SELECT id FROM tasks WHERE status = 'completed' AND completed_at < ? LIMIT ?",
+                (cutoff, batch_size)
+            ).fetchall()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO tasks_archive ({TASK_COLUMNS}, archived_at) "
+                f"SELECT {TASK_COLUMNS}, ? FROM tasks WHERE id = ?",
+                [(archived_at, task_id) for task_id, in ids]
+            )
+            conn.executemany("DELETE FROM tasks WHERE id = ?", ids)
+            return len(ids)
+
+        archived = 0
+        while True:
+            moved = self.writer.submit(archive_batch).result()
+            archived += moved
+            if moved < batch_size:
+                break
+        return returned, archived
+
+    def rollover_tasks_in_background(self):
+        """Run rollover_tasks on a daemon thread; returns a Future for its result"""
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self.rollover_tasks())
+            except Exception as e:
+                future.set_exception(e)
+        threading.Thread(target=run, name='task-rollover', daemon=True).start()
+        return future
+
+    def list_archived_tasks(self, before=None, limit=100):
+        """Return archived Tasks, most recently completed first, starting before the `before` key"""
+        where, params = "", []
+        if before is not None:
+            where = "WHERE (completed_at, id) < (?, ?)"
+            params.extend(before)
+        params.append(limit)
+        rows = self.reader.execute(
+            f"SELECT id, description, status, created_at, completed_at, priority FROM tasks_archive "
+            f"{where} ORDER BY completed_at DESC, id DESC LIMIT ?",
+            params
+        ).fetchall()
+        return [Task(*row) for row in rows]
+
+    def restore_archived_tasks(self, task_ids):
+        """Queue moving archived tasks back to the backlog as pending tasks"""
+        def restore(conn):
+            rows = [(task_id,) for task_id in task_ids]
+            conn.executemany(
+                f"INSERT OR IGNORE INTO tasks ({TASK_COLUMNS}) "
+                f"SELECT id, description, category, priority, 'pending', ?, created_at, NULL "
+                f"FROM tasks_archive WHERE id = ?",
+                [(False, task_id) for task_id in task_ids]
+            )
+            conn.executemany("DELETE FROM tasks_archive WHERE id = ?", rows)
+            return len(rows)
+        return self.writer.submit(restore)
+
+    # Task analytics
+
+    def task_rollups_built(self):
+        """Whether rows that predate the rollup triggers have been rolled up"""
+        result = self.reader.execute("SELECT value FROM app_meta WHERE key = 'task_rollups_built'").fetchone()
+        return result is None or result[0] == '1'
+
+    def rebuild_task_rollups(self):
+        """Queue recomputing task_daily_rollup from every task and archived task"""
+        def rebuild(conn):
+            conn.execute("DELETE FROM task_daily_rollup")
+            conn.execute(
+                """WITH all_tasks AS (
+                       SELECT category, status, created_at, completed_at FROM tasks
+                       UNION ALL
+                       SELECT category, status, created_at, completed_at FROM tasks_archive
+                   )
+                   INSERT INTO task_daily_rollup (day, category, created, completed, lead_seconds)
+                   SELECT day, category, SUM(created), SUM(completed), SUM(lead_seconds) FROM (
+                       SELECT date(created_at) AS day, COALESCE(category, 'general') AS category,
+                              1 AS created, 0 AS completed, 0 AS lead_seconds
+                       FROM all_tasks WHERE created_at IS NOT NULL
+                       UNION ALL
+                       SELECT date(completed_at), COALESCE(category, 'general'), 0, 1,
+                              (julianday(completed_at) - julianday(created_at)) * 86400
+                       FROM all_tasks WHERE status = 'completed' AND completed_at IS NOT NULL
+                   ) GROUP BY day, category"""
+            )
+            conn.execute("INSERT OR REPLACE INTO app_meta (key, value) VALUES ('task_rollups_built', '1')")
+        return self.writer.submit(rebuild)
+
+    def rebuild_task_rollups_in_background(self):
+        """Roll up existing tasks on a daemon thread if it has not been done yet"""
+        def run():
+            if not self.task_rollups_built():
+                try:
+                    self.rebuild_task_rollups().result()
+                except RuntimeError:
+                    pass  # writer closed during shutdown
+        thread = threading.Thread(target=run, name='task-rollups', daemon=True)
+        thread.start()
+        return thread
+
+    def get_task_rollups_by_day(self, start_day: str, end_day: str):
+        """Return (day, created, completed, lead_seconds) rows between two dates, oldest first"""
+        return self.reader.execute(
+            "SELECT day, SUM(created), SUM(completed), SUM(lead_seconds) FROM task_daily_rollup "
+            "WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day",
+            (start_day, end_day)
+        ).fetchall()
+
+    def get_task_rollups_by_category(self, start_day: str, end_day: str):
+        """Return (category, created, completed, lead_seconds) rows between two dates"""
+        return self.reader.execute(
+            "SELECT category, SUM(created), SUM(completed), SUM(lead_seconds) FROM task_daily_rollup "
+            "WHERE day BETWEEN ? AND ? GROUP BY category ORDER BY category",
+            (start_day, end_day)
+        ).fetchall()
+
+    def get_completion_days(self, until_day: str):
+        """Return days up to `until_day` with at least one completion, newest first"""
+        rows = self.reader.execute(
+            "SELECT day FROM task_daily_rollup WHERE day <= ? GROUP BY day HAVING SUM(completed) > 0 ORDER BY day DESC",
+            (until_day,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def update_task_description(self, task: Task, description: str):
+        """Queue a description change; the Future resolves to the updated Task"""
+        updated = task._replace(description=description)
+
+        def update(conn):
+            conn.execute("UPDATE tasks SET description = ? WHERE id = ?", (description, task.id))
+            return updated
+        return self.writer.submit(update)
+
+    def delete_task(self, task_id: str):
+        """Queue a task deletion"""
+        return self.writer.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def move_task_to_daily(self, task_id: str):
+        """Queue moving a backlog task to today's tasks"""
+        return self.writer.execute("UPDATE tasks SET is_daily = ? WHERE id = ?", (True, task_id))
+
+    # Journal
+
+    def add_journal_entry(self, entry_datetime: datetime, content: str, feedback: str):
+        """Queue a journal entry; the Future resolves to its id"""
+        with self._journal_dates_lock:
+            if self._journal_dates is not None:
+                self._journal_dates.add(entry_datetime.date().isoformat())
+
+        def insert(conn):
+            return conn.execute(
+                "INSERT INTO journal_entries (entry_datetime, entry_date, content, feedback, uid) VALUES (?, ?, ?, ?, ?)",
+                (entry_datetime.isoformat(sep=' '), entry_datetime.date().isoformat(), content, feedback,
+                 uuid.uuid4().hex)
+            ).lastrowid
+        return self.writer.submit(insert)
+
+    def set_journal_feedback(self, entry_id: int, feedback: str):
+        """Queue filling in an entry's feedback once it has been generated"""
+        return self.writer.execute(
+            "UPDATE journal_entries SET feedback = ? WHERE id = ?",
+            (feedback, entry_id)
+        )
+
+    def get_journal_entry(self, date_str: str):
+        """Return (content, feedback) of the first entry on a date, or None"""
+        return self.reader.execute(
+            "SELECT content, feedback FROM journal_entries WHERE entry_date = ? ORDER BY entry_datetime LIMIT 1",
+            (date_str,)
+        ).fetchone()
+
+    def get_journal_entries_for_date(self, date_str: str):
+        """Return (entry_datetime, content) rows for a date, newest first"""
+        return self.reader.execute(
+            "SELECT entry_datetime, content FROM journal_entries WHERE entry_date = ? ORDER BY entry_datetime DESC",
+            (date_str,)
+        ).fetchall()
+
+    def get_journal_dates(self):
+        """Return every date that has journal entries, newest first"""
+        rows = self.reader.execute(
+            "SELECT DISTINCT entry_date FROM journal_entries WHERE entry_date IS NOT NULL ORDER BY entry_date DESC"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def journal_dates(self) -> JournalDateIndex:
+        """Sorted index of journal dates, kept current as entries are added"""
+        with self._journal_dates_lock:
+            if self._journal_dates is None:
+                self._journal_dates = JournalDateIndex(self.get_journal_dates())
+            return self._journal_dates
+
+    def invalidate_journal_dates(self):
+        """Drop the date index after entries were changed outside this store"""
+        with self._journal_dates_lock:
+            self._journal_dates = None
+
+    def journal_date_before(self, date_str: str):
+        """Nearest date before `date_str` that has entries, or None"""
+        return self.journal_dates().before(date_str)
+
+    def journal_date_after(self, date_str: str):
+        """Nearest date after `date_str` that has entries, or None"""
+        return self.journal_dates().after(date_str)
+
+    def latest_journal_date(self):
+        return self.journal_dates().latest()
+
+    # Journal sentiment
+
+    def get_unscored_journal_entries(self, after: int, matcher_version: str, limit: int):
+        """Return (id, content) of entries after `after` without a current sentiment score"""
+        return self.reader.execute(
+            """SELECT e.id, e.content FROM journal_entries e
+               LEFT JOIN journal_sentiment s ON s.entry_id = e.id
+               WHERE e.id > ? AND (s.entry_id IS NULL OR s.matcher_version != ?)
+               ORDER BY e.id LIMIT ?""",
+            (after, matcher_version, limit)
+        ).fetchall()
+
+    def save_journal_sentiments(self, rows):
+        """Queue (entry_id, positive, challenge, score, matcher_version) rows"""
+        return self.writer.executemany(
+            "INSERT OR REPLACE INTO journal_sentiment (entry_id, positive, challenge, score, matcher_version) "
+            "VALUES (?, ?, ?, ?, ?)",
+            list(rows)
+        )
+
+    def get_mood_trend(self, start_date=None, end_date=None):
+        """Return (month, entries, positive, challenge, average score) rows, oldest first"""
+        return self.reader.execute(
+            """SELECT substr(e.entry_date, 1, 7) AS month, COUNT(*), SUM(s.positive), SUM(s.challenge), AVG(s.score)
+               FROM journal_sentiment s JOIN journal_entries e ON e.id = s.entry_id
+               WHERE e.entry_date >= ? AND e.entry_date <= ?
+               GROUP BY month ORDER BY month""",
+            (start_date or '0000-00-00', end_date or '9999-99-99')
+        ).fetchall()
+
+    # Feedback cache
+
+    def get_cached_feedback(self, key: str):
+        """Return cached feedback for a key, or None"""
+        result = self.reader.execute("SELECT feedback FROM feedback_cache WHERE key = ?", (key,)).fetchone()
+        if result is None:
+            return None
+        self.writer.execute("UPDATE feedback_cache SET last_used = ? WHERE key = ?",
+                            (time.time(), key), key=('feedback_cache_touch', key))
+        return result[0]
+
+    def put_cached_feedback(self, key: str, feedback: str, max_bytes: int):
+        """Queue caching feedback, evicting least recently used rows beyond `max_bytes`"""
+        def put(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO feedback_cache (key, feedback, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, feedback, len(feedback.encode()), time.time())
+            )
+            return conn.execute(
+                """DELETE FROM feedback_cache WHERE key IN (
+                       SELECT key FROM (
+                           SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS running
+                           FROM feedback_cache
+                       ) WHERE running > ?
+                   )""",
+                (max_bytes,)
+            ).rowcount
+        return self.writer.submit(put)
+
+    def has_journal_search(self):
+        """Whether this SQLite build has the FTS5 journal index"""
+        return self.reader.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_fts'"
+        ).fetchone() is not None
+
+    def search_journal(self, query: str, limit=50):
+        """Return ranked (entry_id, entry_date, entry_datetime, snippet) hits for a search.
+
+        Each word matches as a prefix. Matched terms in the snippet are wrapped
+        in MATCH_START/MATCH_END markers.
+        """
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        if not self.has_journal_search():
+            # No FTS5 in this SQLite build: fall back to a scan
+            like = f"%{' '.join(terms)}%"
+            return self.reader.execute(
+                "SELECT id, entry_date, entry_datetime, substr(content, 1, 120) FROM journal_entries "
+                "WHERE content LIKE ? OR feedback LIKE ? ORDER BY entry_datetime DESC LIMIT ?",
+                (like, like, limit)
+            ).fetchall()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return self.reader.execute(
+            f"""SELECT e.id, e.entry_date, e.entry_datetime,
+                       snippet(journal_fts, -1, '{MATCH_START}', '{MATCH_END}', '…', 12)
+                FROM journal_fts JOIN journal_entries e ON e.id = journal_fts.rowid
+                WHERE journal_fts MATCH ? ORDER BY rank LIMIT ?""",
+            (match, limit)
+        ).fetchall()
+
+    def index_journal_search(self, batch_size=SEARCH_BATCH_SIZE):
+        """Add entries written before the search index existed, one small batch per write.
+
+        Runs until done or the store closes; the progress watermark lives in
+        app_meta, so an interrupted build resumes where it stopped.
+        """
+        if not self.has_journal_search():
+            return
+        meta = dict(self.reader.execute(
+            "SELECT key, value FROM app_meta WHERE key IN ('journal_fts_backfill_upto', 'journal_fts_backfilled')"
+        ).fetchall())
+        upto = int(meta.get('journal_fts_backfill_upto', 0))
+        done = int(meta.get('journal_fts_backfilled', 0))
+
+        def index_batch(conn, after):
+            rows = conn.execute(
+                "SELECT id, content, feedback FROM journal_entries WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (after, upto, batch_size)
+            ).fetchall()
+            # Rows edited since the migration were already indexed by the triggers
+            conn.executemany(
+                "INSERT INTO journal_fts (rowid, content, feedback) "
+                "SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM journal_fts WHERE rowid = ?)",
+                [(entry_id, content, feedback, entry_id) for entry_id, content, feedback in rows]
+            )
+            last = rows[-1][0] if rows else upto
+            conn.execute("UPDATE app_meta SET value = ? WHERE key = 'journal_fts_backfilled'", (str(last),))
+            return last
+
+        while done < upto and not self._closing.is_set():
+            try:
+                done = self.writer.submit(lambda conn, after=done: index_batch(conn, after)).result()
+            except RuntimeError:
+                return  # writer closed during shutdown
+
+    def index_journal_search_in_background(self):
+        """Start index_journal_search on a daemon thread"""
+        thread = threading.Thread(target=self.index_journal_search, name='journal-search-index', daemon=True)
+        thread.start()
+        return thread
+
+    def start_background_catch_up(self):
+        """Index and roll up data that predates those migrations, on daemon threads; returns the threads.
+
+        For long-running entry points (the app, the API server). Both jobs
+        finish at once when there is nothing left to do.
+        """
+        return [self.index_journal_search_in_background(), self.rebuild_task_rollups_in_background()]
+
+    # Weekly planning
+
+    def _note_week_save(self, week_start: str, day_index=None, content=None, intentions=None):
+        """Write a save through to the cached week, if it is cached"""
+        with self._weeks_lock:
+            self._week_saves[week_start] = self._week_saves.get(week_start, 0) + 1
+            cached = self._weeks.get(week_start)
+            if cached is None:
+                return
+            contents, cached_intentions = cached
+            if day_index is not None:
+                contents[day_index] = content
+            else:
+                self._weeks[week_start] = (contents, intentions)
+
+    def _remember_week(self, week_start: str, week, saves_before: int):
+        """Cache a week read from the database unless a save was queued while it was read"""
+        with self._weeks_lock:
+            if self._week_saves.get(week_start, 0) != saves_before:
+                return
+            self._weeks[week_start] = week
+            self._weeks.move_to_end(week_start)
+            while len(self._weeks) > WEEK_CACHE_SIZE:
+                self._weeks.popitem(last=False)
+
+    def _read_week(self, week_start: str):
+        rows = self.reader.execute(
+            "SELECT day_index, content FROM weekly_planning WHERE week_start = ?",
+            (week_start,)
+        ).fetchall()
+        result = self.reader.execute(
+            "SELECT intentions FROM weekly_intentions WHERE week_start = ?",
+            (week_start,)
+        ).fetchone()
+        return dict(rows), result[0] if result else None
+
+    def save_weekly_day(self, week_start: str, day_index: int, content: str):
+        """Queue a save of one day's planning text"""
+        self._note_week_save(week_start, day_index, content)
+        future = self.writer.execute(
+            "INSERT OR REPLACE INTO weekly_planning (week_start, day_index, content) VALUES (?, ?, ?)",
+            (week_start, day_index, content),
+            key=('weekly_planning', week_start, day_index)
+        )
+        with self._weeks_lock:
+            self._pending_weeks[week_start] = future
+        return future
+
+    def save_weekly_intentions(self, week_start: str, intentions: str):
+        """Queue a save of a week's intentions"""
+        self._note_week_save(week_start, intentions=intentions)
+        future = self.writer.execute(
+            "INSERT OR REPLACE INTO weekly_intentions (week_start, intentions) VALUES (?, ?)",
+            (week_start, intentions),
+            key=('weekly_intentions', week_start)
+        )
+        with self._weeks_lock:
+            self._pending_weeks[week_start] = future
+        return future
+
+    def save_weekly_planning(self, week_start: str, contents, intentions: str):
+        """Queue a save of the seven day texts and the intentions for a week"""
+        for day_index, content in enumerate(contents):
+            self.save_weekly_day(week_start, day_index, content)
+        return self.save_weekly_intentions(week_start, intentions)
+
+    def _wait_for_week_saves(self, first_week: str, last_week: str):
+        """Block until the queued saves of the weeks in a range are committed"""
+        # Saves and prefetches on other threads change the dict, so wait on a snapshot taken under the lock
+        with self._weeks_lock:
+            pending = [(week, future) for week, future in self._pending_weeks.items()
+                       if first_week <= week <= last_week]
+        # The writer commits in order, so waiting on a week's last save covers all of them
+        for _, future in pending:
+            future.exception()
+        with self._weeks_lock:
+            for week_start, future in pending:
+                if self._pending_weeks.get(week_start) is future:
+                    del self._pending_weeks[week_start]
+
+    def load_weekly_planning(self, week_start: str):
+        """Return ({day_index: content}, intentions) for a week, from memory when recently used"""
+        with self._weeks_lock:
+            cached = self._weeks.get(week_start)
+            if cached is not None:
+                self._weeks.move_to_end(week_start)
+                return dict(cached[0]), cached[1]
+            saves_before = self._week_saves.get(week_start, 0)
+        self._wait_for_week_saves(week_start, week_start)
+        contents, intentions = self._read_week(week_start)
+        self._remember_week(week_start, (dict(contents), intentions), saves_before)
+        return contents, intentions
+
+    def load_weekly_planning_range(self, first_week: str, last_week: str):
+        """Return {week_start: ({day_index: content}, intentions)} for every saved week in a range.
+
+        One statement covers both tables, each read with a range scan over its
+        week_start primary key. The weeks read also warm the week cache.
+        """
+        self._wait_for_week_saves(first_week, last_week)
+        with self._weeks_lock:
+            saves_before = dict(self._week_saves)
+        rows = self.reader.execute(
+            """SELECT week_start, day_index, content FROM weekly_planning WHERE week_start BETWEEN ? AND ?
+               UNION ALL
+               SELECT week_start, NULL, intentions FROM weekly_intentions WHERE week_start BETWEEN ? AND ?""",
+            (first_week, last_week, first_week, last_week)
+        ).fetchall()
+        weeks = {}
+        for week_start, day_index, content in rows:
+            contents, intentions = weeks.setdefault(week_start, ({}, None))
+            if day_index is None:
+                weeks[week_start] = (contents, content)
+            else:
+                contents[day_index] = content
+        for week_start, (contents, intentions) in weeks.items():
+            self._remember_week(week_start, (dict(contents), intentions), saves_before.get(week_start, 0))
+        return weeks
+
+    def prefetch_weekly_planning(self, week_starts):
+        """Load weeks into the cache on a background thread"""
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='week-prefetch')
+        for week_start in week_starts:
+            self._prefetcher.submit(self._prefetch_week, week_start)
+
+    def _prefetch_week(self, week_start: str):
+        with self._weeks_lock:
+            if week_start in self._weeks or self._closing.is_set():
+                return
+            saves_before = self._week_saves.get(week_start, 0)
+            pending = self._pending_weeks.get(week_start)
+        if pending is not None and not pending.done():
+            return  # a foreground load will wait for the save instead
+        self._remember_week(week_start, self._read_week(week_start), saves_before)
+
+    def invalidate_weekly_planning(self):
+        """Drop cached weeks after planning was changed outside this store"""
+        with self._weeks_lock:
+            self._weeks.clear()
@@ -0,0 +1,392 @@
+"""Delta sync between devices through a small HTTP sync server.
+
+Every change to a synced table is recorded by triggers in sync_log (see
+migration 12): one entry per row, moved to a new sequence number each time
+the row changes. A sync pushes the local entries past the last pushed seq
+together with their current row, then pulls whatever the server received
+since the last pulled seq. Both directions travel as gzipped JSON batches, so
+a sync costs in proportion to what changed, not to the size of the database.
+
+Conflicts are settled per row by last writer wins: the change with the later
+modified_at (UTC, millisecond precision) is kept, and equal timestamps go to
+the higher device id, so every device and the server pick the same winner.
+
+Usage (from the repository root):
+    python -m utils.sync serve                       # reference server on 127.0.0.1:8765
+    python -m utils.sync sync --server http://127.0.0.1:8765
+    python -m utils.sync status
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.migrations import SYNC_KEYS
+from utils.storage import LifeStore
+from utils.transfer import insert_sql, table_info
+
+SYNC_URL = os.environ.get('LIFE360_SYNC_URL')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+BATCH_SIZE = 500  # changes per request
+TIMEOUT = 10  # seconds per request
+LOCAL_COLUMNS = {'journal_entries': {'id'}}  # columns that only mean something on one device
+
+
+def encode(payload) -> bytes:
+    return gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def decode(body: bytes):
+    return json.loads(gzip.decompress(body).decode('utf-8'))
+
+
+def synced_columns(conn, table: str):
+    columns, _ = table_info(conn, table)
+    return [column for column in columns if column not in LOCAL_COLUMNS.get(table, ())]
+
+
+# Client side
+
+def get_meta(store, key: str, default=None):
+    result = store.reader.execute("SELECT value FROM app_meta WHERE key = ?", (key,)).fetchone()
+    return result[0] if result else default
+
+
+def set_meta_sql(key: str):
+    return f"INSERT OR REPLACE INTO app_meta (key, value) VALUES ('{key}', ?)"
+
+
+def local_changes(store, after: int, device_id: str, limit=BATCH_SIZE):
+    """Return (changes, last seq) for up to `limit` unpushed local changes after `after`"""
+    conn = store.reader
+    columns = {}
+    changes = []
+    last = after
+    conn.execute("BEGIN")  # log entries and row data from one snapshot
+    try:
+        rows = conn.execute(
+            "SELECT seq, tbl, row_key, deleted, modified_at FROM sync_log "
+            "WHERE seq > ? AND origin IS NULL ORDER BY seq LIMIT ?",
+            (after, limit)
+        ).fetchall()
+        for seq, table, row_key, deleted, modified_at in rows:
+            last = seq
+            data = None
+            if not deleted:
+                if table not in columns:
+                    columns[table] = synced_columns(conn, table)
+                where = ' AND '.join(f"{column} = ?" for column in SYNC_KEYS[table])
+                row = conn.execute(
+                    f"SELECT {', '.join(columns[table])} FROM {table} WHERE {where}", json.loads(row_key)
+                ).fetchone()
+                if row is None:
+                    continue  # the row's key changed; the new key has its own entry
+                data = dict(zip(columns[table], row))
+            changes.append({'table': table, 'key': row_key, 'deleted': bool(deleted),
+                            'modified_at': modified_at, 'origin': device_id, 'data': data})
+    finally:
+        conn.execute("COMMIT")
+    return changes, last
+
+
+def apply_changes(store, changes, device_id: str, pulled_upto: int):
+    """Queue applying pulled changes that win over the local rows; resolves to how many were applied.
+
+    The pull watermark is saved in the same transaction, so a crash either
+    applies a batch and records it or does neither.
+    """
+    def apply(conn):
+        columns = {}
+        statements = {}  # (table, columns) -> upsert
+        applied = 0
+        for change in changes:
+            table = change['table']
+            if table not in SYNC_KEYS:
+                continue
+            local = conn.execute(
+                "SELECT modified_at, COALESCE(origin, ?) FROM sync_log WHERE tbl = ? AND row_key = ?",
+                (device_id, table, change['key'])
+            ).fetchone()
+            if local is not None and tuple(local) >= (change['modified_at'], change['origin']):
+                continue  # the local row is as new or newer
+            keys = SYNC_KEYS[table]
+            if change['deleted']:
+                where = ' AND '.join(f"{column} = ?" for column in keys)
+                conn.execute(f"DELETE FROM {table} WHERE {where}", json.loads(change['key']))
+            else:
+                if table not in columns:
+                    columns[table] = set(synced_columns(conn, table))
+                present = tuple(column for column in change['data'] if column in columns[table])
+                if (table, present) not in statements:
+                    statements[table, present] = insert_sql(table, present, keys, 'replace')
+                conn.execute(statements[table, present], [change['data'][column] for column in present])
+            # The triggers logged this as a local change; record the remote origin
+            # instead, which also keeps it out of the next push
+            conn.execute(
+                "INSERT INTO sync_log (tbl, row_key, deleted, modified_at, origin) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (tbl, row_key) DO UPDATE SET deleted = excluded.deleted, "
+                "modified_at = excluded.modified_at, origin = excluded.origin",
+                (table, change['key'], int(change['deleted']), change['modified_at'], change['origin'])
+            )
+            applied += 1
+        conn.execute(set_meta_sql('sync_pulled_seq'), (str(pulled_upto),))
+        return applied
+    return store.writer.submit(apply)
+
+
+class SyncClient:
+    """Pushes local changes to a sync server and applies the changes pulled from it"""
+
+    def __init__(self, store, server_url: str, batch_size=BATCH_SIZE, timeout=TIMEOUT):
+        self.store = store
+        self.server_url = server_url.rstrip('/')
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.device_id = get_meta(store, 'sync_device_id')
+
+    def _request(self, path: str, payload=None):
+        request = urllib.request.Request(
+            self.server_url + path,
+            data=None if payload is None else encode(payload),
+            headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip'},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return decode(response.read())
+
+    def check_server(self):
+        """Start over from zero if this database last synced with a different server"""
+        server_id = self._request('/status')['server']
+        if get_meta(self.store, 'sync_server_id') != server_id:
+            # Re-push every change made here; rows pulled from other devices
+            # reach the new server when those devices sync
+            self.store.writer.execute(set_meta_sql('sync_pushed_seq'), ('0',))
+            self.store.writer.execute(set_meta_sql('sync_pulled_seq'), ('0',))
+            self.store.writer.execute(set_meta_sql('sync_server_id'), (server_id,)).result()
+
+    def push(self):
+        """Send every unpushed local change; returns how many were sent"""
+        after = int(get_meta(self.store, 'sync_pushed_seq', 0))
+        pushed = 0
+        while True:
+            changes, last = local_changes(self.store, after, self.device_id, self.batch_size)
+            if last == after:
+                return pushed
+            if changes:
+                self._request('/push', {'device': self.device_id, 'changes': changes})
+            self.store.writer.execute(set_meta_sql('sync_pushed_seq'), (str(last),)).result()
+            after = last
+            pushed += len(changes)
+
+    def pull(self):
+        """Apply every change the server received from other devices; returns how many won locally"""
+        since = int(get_meta(self.store, 'sync_pulled_seq', 0))
+        applied = 0
+        while True:
+            reply = self._request(f'/pull?since={since}&device={self.device_id}&limit={self.batch_size}')
+            if reply['upto'] != since:
+                applied += apply_changes(self.store, reply['changes'], self.device_id, reply['upto']).result()
+                since = reply['upto']
+            if not reply['more']:
+                break
+        if applied:
+            # Pulled rows bypassed the store's in-memory snapshots
+            self.store.invalidate_priorities()
+            self.store.invalidate_journal_dates()
+            self.store.invalidate_weekly_planning()
+        return applied
+
+    def sync(self):
+        """Push, then pull; returns (pushed, applied)"""
+        self.check_server()
+        return self.push(), self.pull()
+
+
+def sync_from_env(store):
+    """Sync with LIFE360_SYNC_URL if it is set; failures are printed, not raised"""
+    if not SYNC_URL:
+        return None
+    try:
+        return SyncClient(store, SYNC_URL).sync()
+    except (OSError, ValueError, KeyError) as e:
+        # Network errors, or a reply that isn't the JSON the protocol expects
+        print(f"Sync with {SYNC_URL} failed: {e}")
+        return None
+
+
+# Reference server
+
+class SyncHub:
+    """Server-side store of the latest change to every row, in arrival order"""
+
+    def __init__(self, db_path='sync_server.db'):
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self._lock = threading.Lock()
+        self.conn.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tbl TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                deleted INTEGER NOT NULL,
+                modified_at TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                data TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_changes_row ON changes (tbl, row_key);
+            CREATE TABLE IF NOT EXISTS hub_meta (key TEXT PRIMARY KEY, value TEXT);
+            '''
+        )
+        self.conn.execute("INSERT OR IGNORE INTO hub_meta (key, value) VALUES ('server_id', ?)", (uuid.uuid4().hex,))
+        self.server_id = self.conn.execute("SELECT value FROM hub_meta WHERE key = 'server_id'").fetchone()[0]
+
+    def status(self):
+        with self._lock:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        return {'server': self.server_id, 'seq': seq}
+
+    def push(self, changes):
+        """Keep each change that wins over the server's copy of its row; returns (accepted, rejected)"""
+        accepted = 0
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for change in changes:
+                    current = self.conn.execute(
+                        "SELECT modified_at, origin FROM changes WHERE tbl = ? AND row_key = ?",
+                        (change['table'], change['key'])
+                    ).fetchone()
+                    if current is not None and tuple(current) >= (change['modified_at'], change['origin']):
+                        continue
+                    # Re-inserting moves the row to a new seq, so every device pulls it
+                    self.conn.execute("DELETE FROM changes WHERE tbl = ? AND row_key = ?",
+                                      (change['table'], change['key']))
+                    self.conn.execute(
+                        "INSERT INTO changes (tbl, row_key, deleted, modified_at, origin, data) VALUES (?, ?, ?, ?, ?, ?)",
+                        (change['table'], change['key'], int(change['deleted']), change['modified_at'],
+                         change['origin'], None if change['data'] is None else json.dumps(change['data']))
+                    )
+                    accepted += 1
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return accepted, len(changes) - accepted
+
+    def pull(self, since: int, device: str, limit=BATCH_SIZE):
+        """Return changes after `since` made by other devices, the seq they reach, and whether more remain"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT seq, tbl, row_key, deleted, modified_at, origin, data FROM changes "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, limit)
+            ).fetchall()
+        changes = [
+            {'table': table, 'key': row_key, 'deleted': bool(deleted), 'modified_at': modified_at,
+             'origin': origin, 'data': None if data is None else json.loads(data)}
+            for _, table, row_key, deleted, modified_at, origin, data in rows
+            if origin != device
+        ]
+        return {'changes': changes, 'upto': rows[-1][0] if rows else since, 'more': len(rows) == limit}
+
+    def close(self):
+        self.conn.close()
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """GET /status, GET /pull?since=&device=&limit= and POST /push, all gzipped JSON"""
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    hub = None  # set by make_server
+
+    def _reply(self, payload, status=200):
+        body = encode(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path == '/status':
+            self._reply(self.hub.status())
+        elif url.path == '/pull':
+            try:
+                since, limit = int(query.get('since', 0)), min(int(query.get('limit', BATCH_SIZE)), BATCH_SIZE * 10)
+            except ValueError:
+                self._reply({'error': 'since and limit must be integers'}, 400)
+                return
+            self._reply(self.hub.pull(since, query.get('device', ''), limit))
+        else:
+            self._reply({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/push':
+            self._reply({'error': 'not found'}, 404)
+            return
+        try:
+            payload = decode(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            accepted, rejected = self.hub.push(payload['changes'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._reply({'error': f'bad push: {e}'}, 400)
+            return
+        self._reply({'accepted': accepted, 'rejected': rejected})
+
+    def log_message(self, format, *args):
+        pass  # keep the console for errors
+
+
+def make_server(hub: SyncHub, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    handler = type('BoundSyncRequestHandler', (SyncRequestHandler,), {'hub': hub})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync the Life360 database between devices")
+    parser.add_argument('command', choices=['serve', 'sync', 'status'])
+    parser.add_argument('--db', help="database path (default: life_management.db, or sync_server.db for serve)")
+    parser.add_argument('--server', default=SYNC_URL or f'http://{DEFAULT_HOST}:{DEFAULT_PORT}', help="sync server URL")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to serve on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to serve on")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        hub = SyncHub(args.db or 'sync_server.db')
+        server = make_server(hub, args.host, args.port)
+        print(f"Sync server listening on http://{args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            hub.close()
+        return
+
+    store = LifeStore(args.db or 'life_management.db')
+    try:
+        if args.command == 'sync':
+            pushed, applied = SyncClient(store, args.server).sync()
+            print(f"Pushed {pushed} changes, applied {applied}")
+        else:
+            unpushed = store.reader.execute(
+                "SELECT COUNT(*) FROM sync_log WHERE seq > ? AND origin IS NULL",
+                (int(get_meta(store, 'sync_pushed_seq', 0)),)
+            ).fetchone()[0]
+            print(f"Device {get_meta(store, 'sync_device_id')}: {unpushed} unpushed changes, "
+                  f"pulled up to server seq {get_meta(store, 'sync_pulled_seq', 0)}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
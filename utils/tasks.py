@@ -0,0 +1,202 @@
+"""In-memory task lists that mirror a Listbox row for row.
+
+The app applies each mutation as a delta (insert, update or remove one row)
+instead of reloading both lists from the database after every click.
+"""
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from utils.metrics import timed
+
+PAGE_SIZE = 100      # rows fetched per page, a few screens' worth
+PREFETCH_ROWS = 40   # fetch the next page once the view is this close to the end
+STATUS_FILTERS = ['pending', 'completed', 'all']
+PRIORITY_LEVELS = {1: 'Normal', 2: 'High', 3: 'Urgent'}
+
+
+class Task(NamedTuple):
+    id: str
+    description: str
+    status: str
+    created_at: str
+    completed_at: Optional[str] = None
+    priority: int = 1
+
+
+def display_text(task: Task) -> str:
+    """Listbox line for a task; raised priorities show as leading '!' marks"""
+    flags = '!' * (task.priority - 1) + ' ' if task.priority and task.priority > 1 else ''
+    return f"{'✓' if task.status == 'completed' else '○'} {flags}{task.description}"
+
+
+class TaskIndex:
+    """Tasks in created_at order, looked up by id in O(1) and by position in O(log n)"""
+
+    def __init__(self, tasks=()):
+        self._tasks = {task.id: task for task in tasks}
+        self._keys = sorted((task.created_at, task.id) for task in self._tasks.values())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def __iter__(self):
+        return (self._tasks[task_id] for _, task_id in self._keys)
+
+    def get(self, task_id: str):
+        return self._tasks.get(task_id)
+
+    def at(self, position: int) -> Task:
+        return self._tasks[self._keys[position][1]]
+
+    def position(self, task_id: str) -> int:
+        task = self._tasks[task_id]
+        return bisect_left(self._keys, (task.created_at, task_id))
+
+    def insert(self, task: Task) -> int:
+        """Add a task and return its position"""
+        key = (task.created_at, task.id)
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._tasks[task.id] = task
+        return position
+
+    def replace(self, task: Task) -> int:
+        """Swap in a new version of a task with the same id and created_at"""
+        self._tasks[task.id] = task
+        return self.position(task.id)
+
+    def remove(self, task_id: str) -> int:
+        """Drop a task and return the position it had"""
+        position = self.position(task_id)
+        del self._keys[position]
+        del self._tasks[task_id]
+        return position
+
+
+class TaskListView:
+    """Keeps a Listbox in step with a TaskIndex by applying row-level deltas"""
+
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.tasks = TaskIndex()
+
+    @timed('view.tasks.load')
+    def load(self, tasks):
+        """Replace every row (initial load only)"""
+        self.tasks = TaskIndex(tasks)
+        self.listbox.delete(0, 'end')
+        self.listbox.insert('end', *[display_text(task) for task in self.tasks])
+
+    def accepts(self, task: Task) -> bool:
+        """Whether a task belongs in this view"""
+        return True
+
+    def selected(self):
+        """Return the first selected Task, or None"""
+        selection = self.selected_tasks()
+        return selection[0] if selection else None
+
+    def selected_tasks(self):
+        """Return every selected Task, in list order"""
+        return [self.tasks.at(position) for position in self.listbox.curselection()
+                if position < len(self.tasks)]
+
+    def insert(self, task: Task):
+        if not self.accepts(task):
+            return
+        position = self.tasks.insert(task)
+        self.listbox.insert(position, display_text(task))
+
+    def update(self, task: Task):
+        if task.id not in self.tasks:
+            return
+        if not self.accepts(task):
+            self.remove(task.id)
+            return
+        position = self.tasks.replace(task)
+        selected = position in self.listbox.curselection()
+        self.listbox.delete(position)
+        self.listbox.insert(position, display_text(task))
+        if selected:
+            self.listbox.selection_set(position)
+
+    def remove(self, task_id: str):
+        if task_id in self.tasks:
+            self.listbox.delete(self.tasks.remove(task_id))
+
+    # Bulk deltas: one pass over the affected rows, never a reload
+
+    def insert_many(self, tasks):
+        for task in tasks:
+            self.insert(task)
+
+    def update_many(self, tasks):
+        for task in tasks:
+            self.update(task)
+
+    def remove_many(self, task_ids):
+        for task_id in task_ids:
+            self.remove(task_id)
+
+
+class PagedTaskListView(TaskListView):
+    """TaskListView that holds only the rows scrolled into view so far.
+
+    Rows come from `fetch_page(status, after, limit)` a page at a time, and the
+    next page is fetched when the visible rows get within PREFETCH_ROWS of the
+    last loaded one. Status filtering happens in the query.
+    """
+
+    def __init__(self, listbox, fetch_page, page_size=PAGE_SIZE, prefetch_rows=PREFETCH_ROWS):
+        super().__init__(listbox)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.prefetch_rows = prefetch_rows
+        self.status = 'pending'
+        self.cursor = None
+        self.exhausted = False
+        self._load_scheduled = False
+
+    def accepts(self, task: Task) -> bool:
+        if self.status != 'all' and task.status != self.status:
+            return False
+        # Rows past the loaded window arrive with a later page
+        return self.exhausted or (self.cursor is not None and (task.created_at, task.id) <= self.cursor)
+
+    def reload(self, status=None):
+        """Drop every row and fetch the first page, optionally switching the status filter"""
+        if status is not None:
+            self.status = status
+        self.cursor = None
+        self.exhausted = False
+        self.load([])
+        self.load_more()
+
+    @timed('view.tasks.load_more')
+    def load_more(self):
+        """Append the next page of rows"""
+        self._load_scheduled = False
+        if self.exhausted:
+            return
+        status = None if self.status == 'all' else self.status
+        page = self.fetch_page(status, self.cursor, self.page_size)
+        self.exhausted = len(page) < self.page_size
+        if page:
+            self.cursor = (page[-1].created_at, page[-1].id)
+            for task in page:
+                self.tasks.insert(task)
+            self.listbox.insert('end', *[display_text(task) for task in page])
+
+    def scroll_command(self, scrollbar_set):
+        """Wrap a scrollbar's set() so scrolling near the end fetches the next page"""
+        def command(first, last):
+            scrollbar_set(first, last)
+            loaded = len(self.tasks)
+            near_end = float(last) * loaded >= loaded - self.prefetch_rows
+            if near_end and not self.exhausted and not self._load_scheduled:
+                self._load_scheduled = True
+                self.listbox.after_idle(self.load_more)
+        return command
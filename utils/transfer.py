@@ -0,0 +1,200 @@
+"""Streaming export and import of the whole database as NDJSON or CSV.
+
+Each table goes to its own file (`tasks.ndjson`, `journal_entries.csv`, ...).
+Export reads through a cursor a chunk at a time with fetchmany, and import
+writes each chunk with one executemany in its own transaction, so memory use
+is the same for a thousand rows or ten million.
+
+Usage (from the repository root):
+    python -m utils.transfer export backup/                     # NDJSON
+    python -m utils.transfer export backup/ --format csv --tables tasks journal_entries
+    python -m utils.transfer import backup/ --on-conflict replace
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from utils.storage import LifeStore
+
+TABLES = ['priorities', 'affirmations', 'vision_images', 'tasks', 'tasks_archive',
+          'journal_entries', 'weekly_planning', 'weekly_intentions']
+FORMATS = ['ndjson', 'csv']
+CONFLICT_POLICIES = ['skip', 'replace', 'abort']
+CHUNK_SIZE = 1000
+
+# Stored images are base64 text and can exceed csv's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def table_info(conn, table: str):
+    """Return (columns, primary key columns) for a table"""
+    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    columns = [row[1] for row in rows]
+    primary_key = [row[1] for row in sorted(rows, key=lambda row: row[5]) if row[5]]
+    return columns, primary_key
+
+
+def _iter_chunks(cursor, chunk_size):
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def export_table(store, table: str, path: str, fmt='ndjson', chunk_size=CHUNK_SIZE):
+    """Stream one table into a file and return the number of rows written"""
+    columns, _ = table_info(store.reader, table)
+    cursor = store.reader.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in _iter_chunks(cursor, chunk_size):
+                writer.writerows(rows)
+                written += len(rows)
+        else:
+            for rows in _iter_chunks(cursor, chunk_size):
+                f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+                written += len(rows)
+    return written
+
+
+def export_database(store, out_dir: str, fmt='ndjson', tables=None, chunk_size=CHUNK_SIZE):
+    """Export tables into `out_dir` from one consistent snapshot; returns {table: rows}"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    conn = store.reader
+    conn.execute("BEGIN")
+    try:
+        for table in tables or TABLES:
+            counts[table] = export_table(store, table, os.path.join(out_dir, f'{table}.{fmt}'), fmt, chunk_size)
+    finally:
+        conn.execute("COMMIT")
+    return counts
+
+
+def _read_records(path: str, fmt: str):
+    """Yield one {column: value} dict per row of an export file"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            for record in csv.DictReader(f):
+                # CSV has no NULL; empty fields come back as None
+                yield {column: value if value != '' else None for column, value in record.items()}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def insert_sql(table: str, columns, primary_key, on_conflict: str) -> str:
+    placeholders = ', '.join('?' for _ in columns)
+    if on_conflict == 'skip':
+        return f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if on_conflict == 'replace' and primary_key:
+        # An upsert rather than INSERT OR REPLACE, so UPDATE triggers (search
+        # index, sentiment) see the change instead of a silent delete
+        updates = [column for column in columns if column not in primary_key]
+        assignments = ', '.join(f"{column} = excluded.{column}" for column in updates)
+        action = f"DO UPDATE SET {assignments}" if updates else "DO NOTHING"
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT ({', '.join(primary_key)}) {action}")
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+def import_table(store, table: str, path: str, fmt='ndjson', on_conflict='skip', chunk_size=CHUNK_SIZE):
+    """Stream one export file into a table and return the number of rows read.
+
+    Every chunk is committed in its own transaction. With on_conflict='abort'
+    the first conflicting row raises, leaving the chunks before it imported.
+    """
+    table_columns, primary_key = table_info(store.reader, table)
+    records = _read_records(path, fmt)
+    first = next(records, None)
+    if first is None:
+        return 0
+    columns = [column for column in first if column in table_columns]
+    ignored = [column for column in first if column not in table_columns]
+    if ignored:
+        print(f"Ignoring unknown {table} columns: {', '.join(ignored)}")
+    # Entries from other tools may only carry entry_datetime
+    derive_entry_date = table == 'journal_entries' and 'entry_date' not in columns and 'entry_datetime' in columns
+    if derive_entry_date:
+        columns.append('entry_date')
+    sql = insert_sql(table, columns, primary_key, on_conflict)
+
+    def to_row(record):
+        row = [record.get(column) for column in columns]
+        if derive_entry_date:
+            row[-1] = (record.get('entry_datetime') or '')[:10] or None
+        return row
+
+    read = 0
+    pending = None
+    chunk = [to_row(first)]
+    for record in records:
+        chunk.append(to_row(record))
+        if len(chunk) >= chunk_size:
+            # Keep one chunk in flight so reading overlaps writing without queueing the file
+            if pending is not None:
+                pending.result()
+            pending = store.writer.executemany(sql, chunk)
+            read += len(chunk)
+            chunk = []
+    if pending is not None:
+        pending.result()
+    if chunk:
+        store.writer.executemany(sql, chunk).result()
+        read += len(chunk)
+    return read
+
+
+def import_database(store, in_dir: str, on_conflict='skip', tables=None, chunk_size=CHUNK_SIZE):
+    """Import every export file found in `in_dir`; returns {table: rows read}"""
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {on_conflict}")
+    if not os.path.isdir(in_dir):
+        raise FileNotFoundError(f"No export directory at {in_dir}")
+    counts = {}
+    for table in tables or TABLES:
+        for fmt in FORMATS:
+            path = os.path.join(in_dir, f'{table}.{fmt}')
+            if os.path.exists(path):
+                counts[table] = import_table(store, table, path, fmt, on_conflict, chunk_size)
+                break
+    # The imported rows bypassed the store's in-memory snapshots
+    store.invalidate_priorities()
+    store.invalidate_journal_dates()
+    store.invalidate_weekly_planning()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import the Life360 database")
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('directory', help="directory holding one file per table")
+    parser.add_argument('--db', default='life_management.db', help="database path")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson', help="export file format")
+    parser.add_argument('--tables', nargs='+', choices=TABLES, help="tables to transfer (default: all)")
+    parser.add_argument('--on-conflict', choices=CONFLICT_POLICIES, default='skip',
+                        help="what to do with imported rows whose key already exists")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="rows per read and per transaction")
+    args = parser.parse_args(argv)
+
+    store = LifeStore(args.db)
+    try:
+        if args.command == 'export':
+            counts = export_database(store, args.directory, args.format, args.tables, args.chunk_size)
+        else:
+            counts = import_database(store, args.directory, args.on_conflict, args.tables, args.chunk_size)
+    finally:
+        store.close()
+    for table, rows in counts.items():
+        print(f"{table:<20} {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
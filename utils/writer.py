@@ -0,0 +1,192 @@
+"""Write-behind queue: one background thread owns the SQLite write connection.
+
+Callers submit work (a callable taking the connection) and get a Future back.
+The writer drains everything queued since its last commit and runs it inside
+one transaction, so a burst of autosaves costs a single commit. Work submitted
+with a `key` replaces any still-queued work with the same key, so only the
+latest autosave of a widget is written.
+"""
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from utils.metrics import instrument_connection
+
+MAX_BATCH = 256
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # WAL + NORMAL only fsyncs at checkpoints
+    "PRAGMA cache_size = -16000",   # 16 MB page cache
+    "PRAGMA mmap_size = 268435456",  # 256 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def configure_connection(conn):
+    """Apply the WAL and cache PRAGMAs shared by the writer and reader connections"""
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class _WorkItem:
+    __slots__ = ('work', 'future', 'key', 'exclusive')
+
+    def __init__(self, work, key, exclusive):
+        self.work = work
+        self.future = Future()
+        self.key = key
+        self.exclusive = exclusive
+
+
+class DatabaseWriter:
+    """Background writer thread with group commits"""
+
+    def __init__(self, db_path: str, max_batch=MAX_BATCH):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, work, key=None, exclusive=False):
+        """Queue `work(conn)` and return a Future for its result.
+
+        `exclusive` work runs outside the group transaction, for callers that
+        manage their own transactions (migrations, bulk imports).
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Database writer is closed")
+            if key is not None and key in self._pending:
+                item = self._pending[key]
+                item.work = work
+                return item.future
+            item = _WorkItem(work, key, exclusive)
+            if key is not None:
+                self._pending[key] = item
+        self._queue.put(item)
+        return item.future
+
+    def execute(self, sql: str, params=(), key=None):
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount, key=key)
+
+    def executemany(self, sql: str, rows, key=None):
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount, key=key)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been committed"""
+        self.submit(lambda conn: None).result(timeout)
+
+    def close(self):
+        """Commit all queued work and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _take(self, item):
+        """Claim an item from the queue so later submits with its key queue anew"""
+        if item is not None and item.key is not None:
+            with self._lock:
+                if self._pending.get(item.key) is item:
+                    del self._pending[item.key]
+        return item
+
+    def _run(self):
+        conn = instrument_connection(configure_connection(sqlite3.connect(self.db_path, isolation_level=None)))
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._take(self._queue.get())]
+                while batch[-1] is not None and len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._take(self._queue.get_nowait()))
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    batch.pop()
+                    stopping = True
+                try:
+                    self._run_batch(conn, batch)
+                except Exception as e:
+                    # Never let the thread die: every later submit would hang on its future
+                    self._fail(conn, batch, e)
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn, batch):
+        group = []
+        for item in batch:
+            if item is None:
+                continue
+            if item.exclusive:
+                self._commit_group(conn, group)
+                group = []
+                self._run_item(conn, item)
+            else:
+                group.append(item)
+        self._commit_group(conn, group)
+
+    def _run_item(self, conn, item):
+        if not item.future.set_running_or_notify_cancel():
+            return
+        try:
+            item.future.set_result(item.work(conn))
+        except Exception as e:
+            self._fail(conn, [item], e)
+
+    def _fail(self, conn, items, error):
+        """Roll back whatever is open and resolve every unresolved future in `items` with `error`"""
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        for item in items:
+            if item is None or item.future.done():
+                continue
+            if item.future.running() or item.future.set_running_or_notify_cancel():
+                item.future.set_exception(error)
+
+    def _commit_group(self, conn, group):
+        """Run queued work in one transaction, isolating failures with savepoints"""
+        if not group:
+            return
+        results = []
+        try:
+            conn.execute("BEGIN")
+            for item in group:
+                if not item.future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT work_item")
+                try:
+                    result = item.work(conn)
+                except Exception as e:
+                    # Work that ended the transaction itself takes the group down at COMMIT
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK TO work_item")
+                        conn.execute("RELEASE work_item")
+                    results.append((item, None, e))
+                    continue
+                conn.execute("RELEASE work_item")
+                results.append((item, result, None))
+            conn.execute("COMMIT")
+        except Exception as e:
+            # BEGIN, a savepoint or COMMIT failed: nothing in the group was committed
+            self._fail(conn, group, e)
+            return
+        # Only resolve futures once the group is durable
+        for item, result, error in results:
+            if error is None:
+                item.future.set_result(result)
+            else:
+                item.future.set_exception(error)